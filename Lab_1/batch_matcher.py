@@ -0,0 +1,170 @@
+# batch_matcher.py
+"""Матричный подбор: много профилей вакансий против всей базы кандидатов.
+
+Профили кодируются в массивы (маски языков и форматов, уровни, границы
+стажа и зарплаты), после чего для блока строк таблицы и блока профилей
+одной операцией с broadcasting вычисляется матрица "прошёл / не прошёл"
+классического режима или матрица логарифмов байесовских оценок. Условия
+профилей сначала вычисляются на различных значениях атрибутов таблицы
+(TableCodes) и затем раскладываются на строки. Размер блоков подбирается
+так, чтобы временные матрицы укладывались в бюджет памяти.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from config import MATCH_MEMORY_BUDGET
+from candidate_manager import CandidateTable, LANGUAGE_VOCAB, FORMAT_VOCAB
+from candidate_stats import TableCodes
+from likelihood import in_range, log_likelihood, salary_near, years_near
+from vocab_search import pref_groups
+
+# Оценка памяти на ячейку матрицы: результат и временные массивы float64
+BYTES_PER_CELL = 48
+
+
+@dataclass
+class ProfileMatrix:
+    """Профили вакансий в колоночном виде (по одному элементу на профиль)."""
+    languages: List[List[int]]   # маски по значениям профиля (классический режим)
+    languages_folded: List[int]  # маски без учёта регистра (байесовский режим)
+    formats: List[List[int]]
+    formats_folded: List[int]
+    levels: List[str]
+    years_min: np.ndarray
+    years_max: np.ndarray
+    salary_min: np.ndarray
+    salary_max: np.ndarray
+
+    @classmethod
+    def encode(cls, profiles: List[Dict[str, Any]], relaxed: bool = False) -> "ProfileMatrix":
+        return cls(
+            languages=[pref_groups(LANGUAGE_VOCAB, p["languages"], relaxed) for p in profiles],
+            languages_folded=[LANGUAGE_VOCAB.folded_mask(p["languages"]) for p in profiles],
+            formats=[pref_groups(FORMAT_VOCAB, p["formats"], relaxed) for p in profiles],
+            formats_folded=[FORMAT_VOCAB.folded_mask(p["formats"]) for p in profiles],
+            levels=[p["level"] for p in profiles],
+            years_min=np.array([p["years_range"][0] for p in profiles], dtype=float),
+            years_max=np.array([p["years_range"][1] for p in profiles], dtype=float),
+            salary_min=np.array([p["salary_range"][0] for p in profiles], dtype=float),
+            salary_max=np.array([p["salary_range"][1] for p in profiles], dtype=float),
+        )
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+def blocks(rows: int, profiles: int, memory_budget: int = MATCH_MEMORY_BUDGET
+           ) -> Iterator[Tuple[slice, slice]]:
+    """Блоки (строки, профили); матрица каждого не превышает бюджет памяти."""
+    cells = max(1, memory_budget // BYTES_PER_CELL)
+    profile_block = max(1, min(profiles, cells))
+    row_block = max(1, cells // profile_block)
+    for r in range(0, rows, row_block):
+        for p in range(0, profiles, profile_block):
+            yield slice(r, min(r + row_block, rows)), slice(p, min(p + profile_block, profiles))
+
+
+def classic_matrix(table: CandidateTable, codes: TableCodes, rows: slice, pm: ProfileMatrix,
+                   cols: slice, require_all: bool) -> np.ndarray:
+    """Матрица (профили x строки): кандидат прошёл все фильтры профиля."""
+    ok = np.ones((cols.stop - cols.start, rows.stop - rows.start), dtype=bool)
+    for values, inverse, prefs in ((codes.language_values, codes.language_inverse, pm.languages),
+                                   (codes.format_values, codes.format_inverse, pm.formats)):
+        wanted = np.array([bool(m) for m in prefs[cols]], dtype=bool)[:, None]
+        if wanted.any():
+            match = _groups_matrix(values, prefs[cols], require_all)
+            ok &= np.take(match | ~wanted, inverse[rows], axis=1)
+
+    wanted = np.array([bool(level) for level in pm.levels[cols]], dtype=bool)[:, None]
+    if wanted.any():
+        level_ok = np.array([[v.lower() == level for v in table.level_vocab]
+                             for level in pm.levels[cols]], dtype=bool).reshape(len(wanted), -1)
+        ok &= np.take(level_ok | ~wanted, table.level_codes[rows], axis=1)
+
+    for values, inverse, low, high in (
+        (codes.years_values, codes.years_inverse, pm.years_min, pm.years_max),
+        (codes.salary_values, codes.salary_inverse, pm.salary_min, pm.salary_max),
+    ):
+        in_range = (low[cols, None] <= values) & (values <= high[cols, None])
+        ok &= np.take(in_range, inverse[rows], axis=1)
+    return ok
+
+
+def bayes_matrix(table: CandidateTable, codes: TableCodes, rows: slice, pm: ProfileMatrix,
+                 cols: slice) -> np.ndarray:
+    """Матрица (профили x строки) логарифмов байесовских оценок (см. likelihood).
+
+    Множители складываются в том же порядке, что и в log_scores; для
+    профилей без критерия слагаемое равно 0, что не меняет результат.
+    """
+    score = np.zeros((cols.stop - cols.start, rows.stop - rows.start))
+
+    # Язык
+    wanted = np.array([bool(m) for m in pm.languages[cols]], dtype=bool)[:, None]
+    if wanted.any():
+        match = _pref_matrix(codes.language_values, pm.languages_folded[cols], False)
+        factor = np.where(wanted, log_likelihood("languages", match), 0.0)
+        score += np.take(factor, codes.language_inverse[rows], axis=1)
+
+    # Уровень
+    wanted = np.array([bool(level) for level in pm.levels[cols]], dtype=bool)[:, None]
+    if wanted.any():
+        level_ok = np.array([[v.lower() == level.lower() for v in table.level_vocab]
+                             for level in pm.levels[cols]], dtype=bool).reshape(len(wanted), -1)
+        factor = np.where(wanted, log_likelihood("level", level_ok), 0.0)
+        score += np.take(factor, table.level_codes[rows], axis=1)
+
+    # Опыт
+    low, high = pm.years_min[cols, None], pm.years_max[cols, None]
+    years = codes.years_values
+    factor = log_likelihood("years", in_range(years, low, high), years_near(years, low, high))
+    score += np.take(factor, codes.years_inverse[rows], axis=1)
+
+    # Формат
+    wanted = np.array([bool(m) for m in pm.formats[cols]], dtype=bool)[:, None]
+    if wanted.any():
+        match = _pref_matrix(codes.format_values, pm.formats_folded[cols], False)
+        factor = np.where(wanted, log_likelihood("formats", match), 0.0)
+        score += np.take(factor, codes.format_inverse[rows], axis=1)
+
+    # Зарплата
+    low, high = pm.salary_min[cols, None], pm.salary_max[cols, None]
+    salary = codes.salary_values
+    factor = log_likelihood("salary", in_range(salary, low, high), salary_near(salary, low, high))
+    score += np.take(factor, codes.salary_inverse[rows], axis=1)
+    return score
+
+
+def _groups_matrix(values: np.ndarray, groups_list: List[List[int]], require_all: bool) -> np.ndarray:
+    """Матрица check_pref по группам масок каждого профиля."""
+    combined = []
+    for groups in groups_list:
+        mask = 0
+        for group in groups:
+            mask |= group
+        combined.append(mask)
+    # В строгом режиме каждая группа — один бит, и all сводится к одной маске
+    if not require_all or all(g and not g & (g - 1) for groups in groups_list for g in groups):
+        return _pref_matrix(values, combined, require_all)
+    match = np.ones((len(groups_list), len(values)), dtype=bool)
+    for i, groups in enumerate(groups_list):
+        for group in set(groups):
+            match[i] &= _pref_matrix(values, [group], False)[0]
+    return match
+
+
+def _pref_matrix(values: np.ndarray, prefs: List[int], require_all: bool) -> np.ndarray:
+    """Матрица check_pref (профили x маски значений): any или all."""
+    if values.dtype == object:
+        wanted = np.array(prefs, dtype=object)[:, None]
+        common = values[None, :] & wanted
+        return (common == wanted) if require_all else (common != 0)
+    # В uint64-масках нет значений с номером словаря 64 и выше
+    low = np.array([m & 0xFFFFFFFFFFFFFFFF for m in prefs], dtype=np.uint64)[:, None]
+    common = values[None, :] & low
+    if not require_all:
+        return common != 0
+    overflow = np.array([m >> 64 != 0 for m in prefs], dtype=bool)[:, None]
+    return (common == low) & ~overflow
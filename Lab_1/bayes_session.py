@@ -0,0 +1,93 @@
+# bayes_session.py
+"""Сессия байесовского подбора с пересчётом только изменённых критериев.
+
+В интерактивном режиме профиль обычно уточняется по одному критерию
+(например, диапазону зарплаты) и подбор запускается снова. Сессия хранит
+последний профиль и вклады множителей (логарифмы, см. likelihood) по
+каждой строке таблицы; при новом запуске заново считаются только столбцы
+изменившихся критериев, после чего кандидаты переранжируются. Смена
+таблицы или её версии (store_version) сбрасывает сохранённые столбцы.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from candidate_manager import Candidate, CandidateTable, store_version
+from candidate_index import CandidateIndex
+from expert_system import _BayesRanking, bayesian_recommend
+from likelihood import FACTORS, factor_column
+
+# Поля профиля, от которых зависит каждый множитель
+FACTOR_FIELDS = {
+    "languages": "languages",
+    "level": "level",
+    "years": "years_range",
+    "formats": "formats",
+    "salary": "salary_range",
+}
+
+
+class BayesSession:
+    """Повторные запуски bayesian_recommend по одной таблице кандидатов."""
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self.table: Optional[CandidateTable] = None
+        self.version: Optional[int] = None
+        self.profile: Optional[Dict[str, Any]] = None
+        self.columns: Dict[str, Optional[np.ndarray]] = {}
+        # Критерии, пересчитанные при последнем запуске
+        self.recomputed: List[str] = []
+
+    def reset(self):
+        self.table = None
+        self.version = None
+        self.profile = None
+        self.columns = {}
+
+    def changed_factors(self, profile: Dict[str, Any]) -> List[str]:
+        """Множители, которые нужно пересчитать для профиля."""
+        if self.profile is None:
+            return list(FACTORS)
+        return [f for f in FACTORS if _field(profile, f) != _field(self.profile, f)]
+
+    def recommend(self, candidates: Iterable, profile: Dict[str, Any],
+                  top_k: Optional[int] = None) -> List[Tuple[Candidate, float]]:
+        """Аналог bayesian_recommend с пересчётом только изменённых столбцов.
+
+        Вклады сохраняются только для таблицы кандидатов; прочие источники
+        (списки, хранилища, потоки пачек) оцениваются полностью.
+        """
+        if isinstance(candidates, CandidateIndex) and len(candidates) == len(candidates.table):
+            # Индекс без добавленных кандидатов: вклады считаются по его таблице
+            candidates = candidates.table
+        if not isinstance(candidates, CandidateTable):
+            self.reset()
+            self.recomputed = list(FACTORS)
+            return bayesian_recommend(candidates, profile, self.threshold, top_k)
+
+        if candidates is not self.table or store_version() != self.version:
+            self.reset()
+            self.table = candidates
+            self.version = store_version()
+
+        self.recomputed = self.changed_factors(profile)
+        for f in self.recomputed:
+            self.columns[f] = factor_column(candidates, f, profile)
+        self.profile = {field: _field(profile, f) for f, field in FACTOR_FIELDS.items()}
+
+        # Сумма в порядке FACTORS, как в log_scores: результат совпадает
+        # с полным пересчётом
+        scores = np.zeros(len(candidates))
+        for f in FACTORS:
+            if self.columns[f] is not None:
+                scores += self.columns[f]
+        ranking = _BayesRanking(self.threshold, top_k)
+        ranking.add(candidates, scores)
+        return ranking.result()
+
+
+def _field(profile: Dict[str, Any], factor: str):
+    value = profile[FACTOR_FIELDS[factor]]
+    # Списки копируются, чтобы изменение профиля снаружи не влияло на сессию
+    return list(value) if isinstance(value, list) else value
@@ -0,0 +1,295 @@
+# benchmark.py
+"""Замеры производительности загрузки и подбора на синтетических базах.
+
+Для каждого размера базы генерируется воспроизводимый (по seed) CSV со
+значениями из config.LANGUAGES, EXPERIENCE_LEVELS и WORK_FORMATS, после
+чего по этапам замеряются find_column, load_candidates (разбор CSV и
+открытие снимка), save_candidate, classic_recommend и bayesian_recommend.
+Каждый этап выполняется в отдельном процессе, поэтому пиковый RSS
+относится к этому этапу. Результаты сохраняются в JSON и сравниваются
+с сохранённым ранее базовым замером.
+
+Пример:
+    python benchmark.py --sizes 1000 100000 --out bench.json
+    python benchmark.py --baseline bench.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import COLUMN_ALIASES, EXPERIENCE_LEVELS, LANGUAGES, WORK_FORMATS
+
+try:
+    import resource
+except ImportError:  # Windows: пиковый RSS не замеряется
+    resource = None
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_SEED = 42
+DEFAULT_QUERIES = 20
+# Сколько вызовов find_column и save_candidate замеряется за этап
+FIND_COLUMN_CALLS = 10_000
+SAVE_CALLS = 200
+# Замедление больше этой доли (и больше MIN_REGRESSION секунд) — регрессия
+REGRESSION_TOLERANCE = 0.2
+MIN_REGRESSION = 0.01
+GENERATE_CHUNK = 500_000
+
+STAGES = ("generate", "find_column", "load_csv", "load_snapshot", "save_candidate",
+          "classic_recommend", "bayesian_recommend")
+
+
+# ---------------------------------------------------------------------------
+# ГЕНЕРАЦИЯ БАЗЫ
+# ---------------------------------------------------------------------------
+
+
+def _combinations(values: List[str], max_items: int) -> List[List[str]]:
+    """Все упорядоченные наборы из 1..max_items различных значений, по длине."""
+    return [[", ".join(p) for p in itertools.permutations(values, k)] for k in range(1, max_items + 1)]
+
+
+def _pick(rng: np.random.Generator, groups: List[List[str]], n: int) -> np.ndarray:
+    # Сначала длина набора (равновероятно), затем сам набор этой длины
+    sizes = rng.integers(0, len(groups), n)
+    result = np.empty(n, dtype=object)
+    for k, group in enumerate(groups):
+        rows = np.flatnonzero(sizes == k)
+        result[rows] = np.array(group, dtype=object)[rng.integers(0, len(group), len(rows))]
+    return result
+
+
+def generate_csv(path: str, rows: int, seed: int = DEFAULT_SEED) -> int:
+    """Пишет синтетическую базу из rows кандидатов; при одном seed файл одинаков."""
+    rng = np.random.default_rng(seed)
+    languages = _combinations(LANGUAGES, 3)
+    formats = _combinations(WORK_FORMATS, 2)
+    levels = np.array(EXPERIENCE_LEVELS, dtype=object)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for start in range(0, max(rows, 1), GENERATE_CHUNK):
+            n = min(GENERATE_CHUNK, rows - start)
+            frame = pd.DataFrame({
+                "name": [f"Кандидат {i}" for i in range(start, start + n)],
+                "language": _pick(rng, languages, n),
+                "level": levels[rng.integers(0, len(levels), n)],
+                "years": rng.integers(0, 16, n),
+                "format": _pick(rng, formats, n),
+                "salary": rng.integers(3, 31, n) * 10_000,
+            })
+            frame.to_csv(f, header=start == 0, index=False)
+    return rows
+
+
+def random_profiles(count: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """Воспроизводимые профили вакансий в формате run_expert_system_flow."""
+    rng = np.random.default_rng(seed + 1)
+    inf = float("inf")
+    profiles = []
+    for _ in range(count):
+        min_years = int(rng.integers(0, 8))
+        min_salary = int(rng.integers(0, 20)) * 10_000
+        profiles.append({
+            "languages": [str(v) for v in rng.choice(LANGUAGES, int(rng.integers(0, 3)), replace=False)],
+            "level": str(rng.choice([""] + EXPERIENCE_LEVELS)),
+            "years_range": (min_years, min_years + int(rng.integers(1, 8))) if rng.random() < 0.7 else (0, inf),
+            "formats": [str(v) for v in rng.choice(WORK_FORMATS, int(rng.integers(0, 2)), replace=False)],
+            "salary_range": (min_salary, min_salary + 100_000) if rng.random() < 0.7 else (min_salary, inf),
+        })
+    return profiles
+
+
+# ---------------------------------------------------------------------------
+# ЭТАПЫ
+# ---------------------------------------------------------------------------
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В Linux ru_maxrss — в килобайтах, в macOS — в байтах
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_stage(stage: str, path: str, rows: int, seed: int, queries: int) -> Dict[str, Any]:
+    """Выполняет этап в текущем (отдельном) процессе; подготовка не замеряется."""
+    import candidate_manager
+    from expert_system import bayesian_recommend, classic_recommend
+    from snapshot import invalidate_snapshot
+
+    candidate_manager.DB_PATH = path
+    flags = {"relaxed": False, "all": False, "why": False, "bayes": False}
+    profiles = random_profiles(queries, seed)
+
+    if stage == "generate":
+        run = lambda: generate_csv(path, rows, seed)
+    elif stage == "find_column":
+        header = list(pd.read_csv(path, nrows=0).columns)
+
+        def run():
+            for i in range(FIND_COLUMN_CALLS):
+                candidate_manager.find_column(header, list(COLUMN_ALIASES)[i % len(COLUMN_ALIASES)])
+            return FIND_COLUMN_CALLS
+    elif stage == "load_csv":
+        invalidate_snapshot(path)
+        run = lambda: len(candidate_manager.load_candidates())
+    elif stage == "load_snapshot":
+        candidate_manager.load_candidates()
+        run = lambda: len(candidate_manager.load_candidates())
+    elif stage == "save_candidate":
+        # Дозапись идёт в копию, чтобы база следующих замеров не менялась
+        candidate_manager.DB_PATH = f"{path}.save.csv"
+        shutil.copyfile(path, candidate_manager.DB_PATH)
+        new = candidate_manager.Candidate(name="Новый кандидат", language=LANGUAGES[:2], level="middle",
+                                          years=3, format=WORK_FORMATS[:1], salary=150_000)
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(SAVE_CALLS):
+                    candidate_manager.save_candidate(new)
+            return SAVE_CALLS
+    else:
+        table = candidate_manager.load_candidates()
+
+        def run():
+            for profile in profiles:
+                if stage == "classic_recommend":
+                    classic_recommend(table, profile, flags)
+                else:
+                    bayesian_recommend(table, profile)
+            # Скорость — число просмотренных кандидатов в секунду
+            return len(table) * len(profiles)
+
+    start = time.perf_counter()
+    count = run()
+    seconds = time.perf_counter() - start
+    if stage == "save_candidate":
+        os.remove(candidate_manager.DB_PATH)
+    return {"seconds": seconds, "count": count, "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_benchmarks(sizes: List[int], seed: int = DEFAULT_SEED, queries: int = DEFAULT_QUERIES,
+                   workdir: str = "bench_data", stages=STAGES) -> List[Dict[str, Any]]:
+    """Замеряет этапы для каждого размера базы; каждый этап — в новом процессе."""
+    os.makedirs(workdir, exist_ok=True)
+    context = mp.get_context("spawn")
+    results = []
+    for rows in sizes:
+        path = os.path.join(workdir, f"candidates_{rows}_{seed}.csv")
+        for stage in stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                measured = pool.submit(_run_stage, stage, path, rows, seed, queries).result()
+            seconds = measured["seconds"]
+            result = {
+                "size": rows,
+                "stage": stage,
+                "seconds": seconds,
+                "peak_rss_mb": measured["peak_rss_mb"],
+                "count": measured["count"],
+                "per_second": measured["count"] / seconds if seconds > 0 else None,
+            }
+            print(_format_row(result), flush=True)
+            results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# ОТЧЁТ И СРАВНЕНИЕ С БАЗОВЫМ ЗАМЕРОМ
+# ---------------------------------------------------------------------------
+
+
+def _format_row(result: Dict[str, Any], note: str = "") -> str:
+    rss = result["peak_rss_mb"]
+    rate = result["per_second"]
+    return (f"{result['size']:>10} | {result['stage']:<18} | {result['seconds']:>9.4f} с | "
+            f"{'—' if rss is None else f'{rss:.1f}':>8} МБ | "
+            f"{'—' if rate is None else f'{rate:,.0f}':>15} /с {note}").rstrip()
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float = REGRESSION_TOLERANCE) -> List[Dict[str, Any]]:
+    """Этапы, замедлившиеся относительно базового замера больше чем на tolerance."""
+    base = {(r["size"], r["stage"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = base.get((result["size"], result["stage"]))
+        if before is None:
+            continue
+        slower = result["seconds"] - before["seconds"]
+        if slower > MIN_REGRESSION and result["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append({**result, "baseline_seconds": before["seconds"]})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности Lab_1")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="размеры базы (до 10_000_000)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES,
+                        help="число профилей на этап подбора")
+    parser.add_argument("--workdir", default="bench_data", help="каталог сгенерированных баз")
+    parser.add_argument("--out", help="файл JSON для результатов")
+    parser.add_argument("--baseline", help="JSON базового замера для сравнения")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    stages = [s for s in STAGES if s in args.stages]
+    if "generate" not in stages:
+        missing = [n for n in args.sizes
+                   if not os.path.isfile(os.path.join(args.workdir, f"candidates_{n}_{args.seed}.csv"))]
+        if missing:
+            stages.insert(0, "generate")
+
+    print(f"{'строк':>10} | {'этап':<18} | {'время':>11} | {'пик RSS':>11} | {'скорость':>18}")
+    results = run_benchmarks(args.sizes, args.seed, args.queries, args.workdir, stages)
+
+    if args.out:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "seed": args.seed,
+                "queries": args.queries,
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if not regressions:
+            print(f"\nРегрессий относительно {args.baseline} нет (допуск {args.tolerance:.0%}).")
+            return 0
+        print(f"\nРегрессии относительно {args.baseline} (допуск {args.tolerance:.0%}):")
+        for r in regressions:
+            print(_format_row(r, f"было {r['baseline_seconds']:.4f} с"))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
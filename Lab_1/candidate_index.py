@@ -0,0 +1,237 @@
+# candidate_index.py
+"""Инвертированный индекс базы кандидатов для классического подбора.
+
+Для каждого языка и формата работы хранится отсортированный массив номеров
+кандидатов, для уровня — такие же списки по значению в нижнем регистре,
+для стажа и зарплаты — отсортированные значения с перестановкой строк.
+Условия any/all по языкам и форматам сводятся к объединению и пересечению
+списков, диапазоны — к двоичному поиску. Новые кандидаты попадают в
+небольшой буфер, который проверяется линейно и периодически вливается
+в индекс. Чтобы индекс видел кандидатов, дописанных в этом процессе,
+его нужно подписать на запись вызовом attach() (так делает main.py);
+записи других процессов индекс не видит — его нужно построить заново.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from candidate_manager import (
+    Candidate,
+    CandidateTable,
+    LANGUAGE_VOCAB,
+    FORMAT_VOCAB,
+    Vocabulary,
+    add_save_listener,
+    remove_save_listener,
+)
+from vocab_search import pref_groups
+
+# Сколько добавленных кандидатов копится в буфере до перестройки индекса
+MERGE_THRESHOLD = 4096
+
+
+class CandidateIndex:
+    """Индекс по языкам, форматам, уровню, стажу и зарплате кандидатов."""
+
+    def __init__(self, table: CandidateTable):
+        self.table = table
+        self._added: List[Candidate] = []
+        self._level_ids: Dict[str, int] = {}
+        key_codes = np.array(
+            [self._level_id(v.lower()) for v in table.level_vocab], dtype=np.int32
+        )
+        self.level_keys = key_codes[table.level_codes] if len(key_codes) else np.empty(0, np.int32)
+        self.years = np.asarray(table.years, dtype=np.int64)
+        self.salary = np.asarray(table.salary, dtype=np.int64)
+        self.language_masks = table.language_masks
+        self.format_masks = table.format_masks
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self.table) + len(self._added)
+
+    def __iter__(self):
+        """Исходная таблица, затем добавленные кандидаты (порядок номеров строк)."""
+        yield self.table
+        yield from self._added
+
+    def attach(self):
+        """Подписывает индекс на новых кандидатов из save_candidate.
+
+        Без подписки индекс остаётся снимком таблицы, по которой построен.
+        """
+        add_save_listener(self.add)
+
+    def detach(self):
+        remove_save_listener(self.add)
+
+    def candidate(self, row: int) -> Candidate:
+        if row < len(self.table):
+            return self.table[row]
+        return self._added[row - len(self.table)]
+
+    def add(self, candidate: Candidate):
+        """Инкрементально добавляет кандидата в индекс."""
+        self._added.append(candidate)
+        if len(self) - len(self.years) >= MERGE_THRESHOLD:
+            self._merge()
+
+    def query(self, profile: Dict[str, Any], flags: Dict[str, bool]) -> List[Candidate]:
+        """Классический подбор по индексу (порядок как у исходной базы)."""
+        return [self.candidate(row) for row in self.select(profile, flags)]
+
+    def select(self, profile: Dict[str, Any], flags: Dict[str, bool]) -> np.ndarray:
+        """Номера кандидатов, прошедших все фильтры профиля, по возрастанию."""
+        n = len(self.years)
+        sets = [
+            self._pref_rows(self.language_postings, LANGUAGE_VOCAB, profile["languages"], flags),
+            self._pref_rows(self.format_postings, FORMAT_VOCAB, profile["formats"], flags),
+        ]
+        if profile["level"]:
+            level_id = self._level_ids.get(profile["level"])
+            sets.append(self.level_postings.get(level_id, np.empty(0, dtype=np.intp)))
+        sets = [s for s in sets if s is not None]
+
+        ranges = []
+        for values, order, sorted_values, (low, high) in (
+            (self.years, self.years_order, self.years_sorted, profile["years_range"]),
+            (self.salary, self.salary_order, self.salary_sorted, profile["salary_range"]),
+        ):
+            lo = np.searchsorted(sorted_values, low, side="left")
+            hi = np.searchsorted(sorted_values, high, side="right")
+            if lo > 0 or hi < n:
+                ranges.append((hi - lo, values, order, lo, hi, low, high))
+
+        # Ведущим берётся самое маленькое множество, остальные условия
+        # проверяются только на его элементах
+        smallest_set = min(sets, key=len, default=None)
+        smallest_range = min(ranges, key=lambda r: r[0], default=None)
+        if smallest_range is not None and (smallest_set is None or smallest_range[0] < len(smallest_set)):
+            _, _, order, lo, hi, _, _ = smallest_range
+            rows = np.sort(order[lo:hi])
+            ranges.remove(smallest_range)
+        elif smallest_set is not None:
+            rows = smallest_set
+            sets = [s for s in sets if s is not smallest_set]
+        else:
+            rows = np.arange(n)
+
+        for s in sorted(sets, key=len):
+            rows = _intersect(rows, s)
+        for _, values, _, _, _, low, high in ranges:
+            picked = values[rows]
+            rows = rows[(low <= picked) & (picked <= high)]
+
+        pending = [
+            len(self.years) + i
+            for i, c in enumerate(self._added[len(self.years) - len(self.table):])
+            if _matches(c, profile, flags)
+        ]
+        if pending:
+            rows = np.concatenate([rows, np.array(pending, dtype=rows.dtype)])
+        return rows
+
+    def _level_id(self, key: str) -> int:
+        return self._level_ids.setdefault(key, len(self._level_ids))
+
+    def _pref_rows(self, postings: Dict[int, np.ndarray], vocab: Vocabulary,
+                   prefs: List[str], flags: Dict[str, bool]) -> Optional[np.ndarray]:
+        """Строки с нужными значениями: пересечение (all) или объединение (any)."""
+        if not prefs:
+            return None
+        empty = np.empty(0, dtype=np.intp)
+        lists = []
+        for group in set(pref_groups(vocab, prefs, flags["relaxed"])):
+            # В мягком режиме одному значению профиля соответствует несколько битов
+            bits = [postings.get(vocab.ids[value], empty) for value in vocab.decode(group)]
+            lists.append(bits[0] if len(bits) == 1 else _union(bits))
+        if flags["all"]:
+            rows = min(lists, key=len)
+            for other in sorted(lists, key=len):
+                if other is not rows:
+                    rows = _intersect(rows, other)
+            return rows
+        return lists[0] if len(lists) == 1 else _union(lists)
+
+    def _merge(self):
+        """Вливает буфер добавленных кандидатов в массивы индекса."""
+        new = self._added[len(self.years) - len(self.table):]
+        self.years = np.concatenate([self.years, np.array([c.years for c in new], dtype=np.int64)])
+        self.salary = np.concatenate([self.salary, np.array([c.salary for c in new], dtype=np.int64)])
+        self.level_keys = np.concatenate([
+            self.level_keys,
+            np.array([self._level_id(c.level.lower()) for c in new], dtype=np.int32),
+        ])
+        self.language_masks = _extend_masks(self.language_masks, [c.language_mask for c in new])
+        self.format_masks = _extend_masks(self.format_masks, [c.format_mask for c in new])
+        self._rebuild()
+
+    def _rebuild(self):
+        self.years_order = np.argsort(self.years, kind="stable")
+        self.years_sorted = self.years[self.years_order]
+        self.salary_order = np.argsort(self.salary, kind="stable")
+        self.salary_sorted = self.salary[self.salary_order]
+
+        order = np.argsort(self.level_keys, kind="stable")
+        keys, starts = np.unique(self.level_keys[order], return_index=True)
+        self.level_postings = dict(zip(keys.tolist(), np.split(order, starts[1:])))
+
+        self.language_postings = _bit_postings(self.language_masks)
+        self.format_postings = _bit_postings(self.format_masks)
+
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Пересечение отсортированных массивов за O(|a| log |b|), |a| <= |b|."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a) or not len(b):
+        return a[:0]
+    pos = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[pos] == a]
+
+
+def _union(lists: List[np.ndarray]) -> np.ndarray:
+    if not lists:
+        return np.empty(0, dtype=np.intp)
+    return np.unique(np.concatenate(lists))
+
+
+def _bit_postings(masks: np.ndarray) -> Dict[int, np.ndarray]:
+    """Списки строк для каждого установленного бита масок."""
+    postings: Dict[int, np.ndarray] = {}
+    if masks.dtype == object:
+        rows_by_bit: Dict[int, List[int]] = {}
+        for row, mask in enumerate(masks):
+            mask = int(mask)
+            while mask:
+                low = mask & -mask
+                rows_by_bit.setdefault(low.bit_length() - 1, []).append(row)
+                mask ^= low
+        return {bit: np.array(rows, dtype=np.intp) for bit, rows in rows_by_bit.items()}
+
+    present = int(np.bitwise_or.reduce(masks)) if len(masks) else 0
+    for bit in range(64):
+        if present >> bit & 1:
+            postings[bit] = np.flatnonzero(masks & np.uint64(1 << bit))
+    return postings
+
+
+def _extend_masks(masks: np.ndarray, new: List[int]) -> np.ndarray:
+    if masks.dtype != object and all(m < 1 << 64 for m in new):
+        return np.concatenate([masks, np.array(new, dtype=np.uint64)])
+    return np.concatenate([masks.astype(object), np.array(new, dtype=object)])
+
+
+def _matches(c: Candidate, profile: Dict[str, Any], flags: Dict[str, bool]) -> bool:
+    """Скалярная проверка кандидата из буфера (семантика classic_recommend)."""
+    for mask, vocab, prefs in ((c.language_mask, LANGUAGE_VOCAB, profile["languages"]),
+                               (c.format_mask, FORMAT_VOCAB, profile["formats"])):
+        if prefs:
+            hits = [bool(mask & group) for group in pref_groups(vocab, prefs, flags["relaxed"])]
+            if not (all(hits) if flags["all"] else any(hits)):
+                return False
+    if profile["level"] and profile["level"] != c.level.lower():
+        return False
+    if not (profile["years_range"][0] <= c.years <= profile["years_range"][1]):
+        return False
+    return profile["salary_range"][0] <= c.salary <= profile["salary_range"][1]
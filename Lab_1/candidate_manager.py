@@ -1,16 +1,324 @@
+import csv
+import os
+import sys
+import time
+import numpy as np
 import pandas as pd
-from config import DB_PATH, COLUMN_ALIASES
-from dataclasses import dataclass
-from typing import List, Dict, Any
+from config import (
+    DB_PATH, COLUMN_ALIASES, LANGUAGES, WORK_FORMATS,
+    CHUNK_SIZE, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL,
+)
+from snapshot import PackedStrings, read_snapshot, write_snapshot, invalidate_snapshot
+from candidate_stats import CandidateStats, TableCodes
+from dataclasses import dataclass, fields
+from functools import cached_property
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+class Vocabulary:
+    """Словарь интернирования значений: строка -> номер бита в маске.
+
+    Начальные значения берутся из config, новые добавляются по мере
+    появления. Дополнительно хранятся маски значений без учёта регистра.
+    """
+
+    def __init__(self, seed: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._folded: Dict[str, int] = {}
+        for value in seed:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.values)
+            self.values.append(sys.intern(value))
+            key = value.lower()
+            self._folded[key] = self._folded.get(key, 0) | (1 << idx)
+        return idx
+
+    def mask(self, values: Iterable[str]) -> int:
+        """Маска точных значений (неизвестные значения интернируются)."""
+        result = 0
+        for value in values:
+            result |= 1 << self.intern(value)
+        return result
+
+    def folded_mask(self, values: Iterable[str]) -> int:
+        """Маска всех значений словаря, совпадающих с данными без учёта регистра."""
+        result = 0
+        for value in values:
+            result |= self._folded.get(value.lower(), 0)
+        return result
+
+    def decode(self, mask: int) -> List[str]:
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.values[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+LANGUAGE_VOCAB = Vocabulary(LANGUAGES)
+FORMAT_VOCAB = Vocabulary(WORK_FORMATS)
 
-@dataclass
 class Candidate:
-    name: str
-    language: List[str]
-    level: str
-    years: int
-    format: List[str]
-    salary: int
+    """Кандидат с языками и форматами работы в виде битовых масок.
+
+    Списки language/format восстанавливаются из масок по запросу (в порядке
+    словаря, без повторов), что позволяет проверять пересечения одной
+    битовой операцией и хранить кандидата в компактном объекте со __slots__.
+    """
+    __slots__ = ("name", "language_mask", "level", "years", "format_mask", "salary")
+
+    def __init__(self, name: str, language: Iterable[str], level: str, years: int,
+                 format: Iterable[str], salary: int):
+        self.name = name
+        self.language_mask = LANGUAGE_VOCAB.mask(language)
+        self.level = sys.intern(level)
+        self.years = years
+        self.format_mask = FORMAT_VOCAB.mask(format)
+        self.salary = salary
+
+    @classmethod
+    def from_masks(cls, name: str, language_mask: int, level: str, years: int,
+                   format_mask: int, salary: int) -> "Candidate":
+        c = cls.__new__(cls)
+        c.name = name
+        c.language_mask = language_mask
+        c.level = level
+        c.years = years
+        c.format_mask = format_mask
+        c.salary = salary
+        return c
+
+    @property
+    def language(self) -> List[str]:
+        return LANGUAGE_VOCAB.decode(self.language_mask)
+
+    @property
+    def format(self) -> List[str]:
+        return FORMAT_VOCAB.decode(self.format_mask)
+
+    def __eq__(self, other):
+        if not isinstance(other, Candidate):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"Candidate(name={self.name!r}, language={self.language!r}, "
+                f"level={self.level!r}, years={self.years!r}, "
+                f"format={self.format!r}, salary={self.salary!r})")
+
+@dataclass
+class CandidateTable:
+    """Колоночное представление базы кандидатов.
+
+    Имена хранятся одним UTF-8 буфером со смещениями (PackedStrings),
+    стаж и зарплата — в массивах NumPy, уровень — кодами словаря,
+    языки и форматы — плоскими массивами кодов со смещениями строк.
+    Объекты Candidate создаются лениво при обращении по индексу.
+    """
+    names: PackedStrings
+    level_codes: np.ndarray
+    level_vocab: List[str]
+    years: np.ndarray
+    salary: np.ndarray
+    language_codes: np.ndarray
+    language_offsets: np.ndarray
+    language_vocab: List[str]
+    format_codes: np.ndarray
+    format_offsets: np.ndarray
+    format_vocab: List[str]
+
+    @classmethod
+    def empty(cls) -> "CandidateTable":
+        return cls(
+            names=PackedStrings.pack([]),
+            level_codes=np.empty(0, dtype=np.int32),
+            level_vocab=[],
+            years=np.empty(0, dtype=np.int64),
+            salary=np.empty(0, dtype=np.int64),
+            language_codes=np.empty(0, dtype=np.int32),
+            language_offsets=np.zeros(1, dtype=np.int64),
+            language_vocab=[],
+            format_codes=np.empty(0, dtype=np.int32),
+            format_offsets=np.zeros(1, dtype=np.int64),
+            format_vocab=[],
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CandidateTable":
+        """Строит таблицу из DataFrame векторными операциями pandas/NumPy."""
+        cols = list(df.columns)
+        col_name = find_column(cols, "name")
+        col_lang = find_column(cols, "language")
+        col_level = find_column(cols, "level")
+        col_years = find_column(cols, "years")
+        col_format = find_column(cols, "format")
+        col_salary = find_column(cols, "salary")
+
+        names = df[col_name].fillna("nan").astype(str).str.strip()
+        keep = ((names != "") & (names.str.lower() != "nan")).to_numpy()
+        df = df[keep]
+        names = names[keep]
+
+        levels = df[col_level].fillna("nan").astype(str).str.strip()
+        level_codes, level_vocab = pd.factorize(levels)
+        level_vocab = [sys.intern(str(v)) for v in level_vocab]
+        lang_codes, lang_offsets, lang_vocab = _encode_lists(df[col_lang])
+        fmt_codes, fmt_offsets, fmt_vocab = _encode_lists(df[col_format])
+
+        return cls(
+            names=PackedStrings.pack(names),
+            level_codes=level_codes.astype(np.int32),
+            level_vocab=level_vocab,
+            years=_coerce_int(df[col_years]),
+            salary=_coerce_int(df[col_salary]),
+            language_codes=lang_codes,
+            language_offsets=lang_offsets,
+            language_vocab=lang_vocab,
+            format_codes=fmt_codes,
+            format_offsets=fmt_offsets,
+            format_vocab=fmt_vocab,
+        )
+
+    @classmethod
+    def from_candidates(cls, candidates: Iterable[Candidate]) -> "CandidateTable":
+        """Строит таблицу из объектов Candidate (коды — номера общих словарей)."""
+        candidates = list(candidates)
+        level_ids: Dict[str, int] = {}
+        level_codes = np.array([level_ids.setdefault(c.level, len(level_ids)) for c in candidates],
+                               dtype=np.int32)
+        lang_codes, lang_offsets = _mask_codes([c.language_mask for c in candidates])
+        fmt_codes, fmt_offsets = _mask_codes([c.format_mask for c in candidates])
+        return cls(
+            names=PackedStrings.pack(c.name for c in candidates),
+            level_codes=level_codes,
+            level_vocab=list(level_ids),
+            years=np.array([c.years for c in candidates], dtype=np.int64),
+            salary=np.array([c.salary for c in candidates], dtype=np.int64),
+            language_codes=lang_codes,
+            language_offsets=lang_offsets,
+            language_vocab=list(LANGUAGE_VOCAB.values),
+            format_codes=fmt_codes,
+            format_offsets=fmt_offsets,
+            format_vocab=list(FORMAT_VOCAB.values),
+        )
+
+    def columns(self) -> Dict[str, Any]:
+        """Колонки таблицы в виде словаря (для снимка на диске)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Candidate]:
+        for i in range(len(self)):
+            yield self._candidate(i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._candidate(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("индекс кандидата вне диапазона")
+        return self._candidate(index)
+
+    def shard(self, start: int, stop: int) -> "CandidateTable":
+        """Строки [start, stop) как таблица поверх тех же массивов."""
+        lang_start, lang_stop = self.language_offsets[start], self.language_offsets[stop]
+        fmt_start, fmt_stop = self.format_offsets[start], self.format_offsets[stop]
+        return CandidateTable(
+            names=self.names[start:stop],
+            level_codes=self.level_codes[start:stop],
+            level_vocab=self.level_vocab,
+            years=self.years[start:stop],
+            salary=self.salary[start:stop],
+            language_codes=self.language_codes[lang_start:lang_stop],
+            language_offsets=self.language_offsets[start:stop + 1] - lang_start,
+            language_vocab=self.language_vocab,
+            format_codes=self.format_codes[fmt_start:fmt_stop],
+            format_offsets=self.format_offsets[start:stop + 1] - fmt_start,
+            format_vocab=self.format_vocab,
+        )
+
+    def languages_of(self, i: int) -> List[str]:
+        start, end = self.language_offsets[i], self.language_offsets[i + 1]
+        return [self.language_vocab[c] for c in self.language_codes[start:end]]
+
+    def formats_of(self, i: int) -> List[str]:
+        start, end = self.format_offsets[i], self.format_offsets[i + 1]
+        return [self.format_vocab[c] for c in self.format_codes[start:end]]
+
+    @cached_property
+    def language_masks(self) -> np.ndarray:
+        """Маски языков по строкам в битах общего словаря LANGUAGE_VOCAB."""
+        return _row_masks(self.language_codes, self.language_offsets,
+                          self.language_vocab, LANGUAGE_VOCAB)
+
+    @cached_property
+    def format_masks(self) -> np.ndarray:
+        """Маски форматов по строкам в битах общего словаря FORMAT_VOCAB."""
+        return _row_masks(self.format_codes, self.format_offsets,
+                          self.format_vocab, FORMAT_VOCAB)
+
+    @cached_property
+    def stats(self) -> CandidateStats:
+        """Частоты значений и гистограммы атрибутов для планировщика фильтров."""
+        return CandidateStats.from_table(self)
+
+    @cached_property
+    def codes(self) -> TableCodes:
+        """Различные значения атрибутов и их номера по строкам."""
+        return TableCodes.from_table(self)
+
+    def _candidate(self, i: int) -> Candidate:
+        return Candidate.from_masks(
+            name=self.names[i],
+            language_mask=int(self.language_masks[i]),
+            level=self.level_vocab[self.level_codes[i]],
+            years=int(self.years[i]),
+            format_mask=int(self.format_masks[i]),
+            salary=int(self.salary[i]),
+        )
+
+def _row_masks(codes: np.ndarray, offsets: np.ndarray, local_vocab: List[str],
+               vocab: Vocabulary) -> np.ndarray:
+    """Сворачивает коды строк в битовые маски общего словаря.
+
+    Пока словарь помещается в 64 бита, маски хранятся в uint64,
+    иначе — в массиве целых Python произвольной длины.
+    """
+    global_ids = [vocab.intern(value) for value in local_vocab]
+    if len(vocab) <= 64:
+        bits = np.array([1 << g for g in global_ids], dtype=np.uint64)
+        masks = np.zeros(len(offsets) - 1, dtype=np.uint64)
+    else:
+        bits = np.array([1 << g for g in global_ids], dtype=object)
+        masks = np.zeros(len(offsets) - 1, dtype=object)
+    nonempty = np.diff(offsets) > 0
+    if nonempty.any():
+        masks[nonempty] = np.bitwise_or.reduceat(bits[codes], offsets[:-1][nonempty])
+    return masks
+
+def _mask_codes(masks: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Раскладывает битовые маски в плоские коды (номера битов) и смещения."""
+    codes: List[int] = []
+    offsets = np.zeros(len(masks) + 1, dtype=np.int64)
+    for i, mask in enumerate(masks):
+        while mask:
+            low = mask & -mask
+            codes.append(low.bit_length() - 1)
+            mask ^= low
+        offsets[i + 1] = len(codes)
+    return np.array(codes, dtype=np.int32), offsets
 
 def find_column(df_cols: List[str], key: str) -> str:
     """Находит имя колонки в DataFrame по набору синонимов."""
@@ -21,76 +329,237 @@ def find_column(df_cols: List[str], key: str) -> str:
             return norm_cols[norm_alias]
     raise KeyError(f"Не найдена колонка для '{key}' в файле {DB_PATH}.")
 
-def load_candidates() -> List[Candidate]:
-    """Загружает кандидатов из CSV файла."""
+def _coerce_int(col: pd.Series) -> np.ndarray:
+    """Векторно приводит колонку к int64; некорректные значения заменяются нулём."""
+    if pd.api.types.is_integer_dtype(col) and not col.isna().any():
+        return col.to_numpy(dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(col):
+        values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        # Как и int(str), принимаем только целочисленную запись
+        text = col.astype(str).str.strip()
+        integral = text.str.fullmatch(r"[+-]?\d+", na=False)
+        values = pd.to_numeric(text.where(integral), errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+    values = np.where(np.isfinite(values), values, 0.0)
+    return np.trunc(values).astype(np.int64)
+
+def _encode_lists(col: pd.Series) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Разбивает значения по запятой и кодирует элементы по словарю.
+
+    Разбор строк выполняется один раз на каждое уникальное значение ячейки,
+    после чего коды разворачиваются на все строки векторно.
+    Возвращает плоский массив кодов, смещения строк (len + 1) и словарь.
+    """
+    cell_codes, cells = pd.factorize(col)
+    vocab: Dict[str, int] = {}
+    cell_tokens = []
+    for cell in cells:
+        tokens = [t.strip() for t in str(cell).split(",")]
+        cell_tokens.append([vocab.setdefault(t, len(vocab)) for t in tokens])
+
+    cell_counts = np.array([len(t) for t in cell_tokens], dtype=np.int64)
+    cell_offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+    np.cumsum(cell_counts, out=cell_offsets[1:])
+    flat_tokens = np.fromiter(
+        (c for tokens in cell_tokens for c in tokens), dtype=np.int32, count=cell_offsets[-1]
+    )
+
+    present = cell_codes >= 0
+    counts = np.zeros(len(col), dtype=np.int64)
+    counts[present] = cell_counts[cell_codes[present]]
+    offsets = np.zeros(len(col) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    # Позиция каждого элемента строки внутри токенов её уникальной ячейки
+    row_starts = np.repeat(cell_offsets[cell_codes[present]], counts[present])
+    within = np.arange(offsets[-1]) - np.repeat(offsets[:-1][present], counts[present])
+    codes = flat_tokens[row_starts + within]
+    return codes, offsets, list(vocab)
+
+def load_candidates() -> CandidateTable:
+    """Загружает кандидатов из CSV файла.
+
+    Если рядом с CSV лежит актуальный бинарный снимок, таблица открывается
+    из него без разбора CSV; иначе снимок создаётся после разбора.
+    """
+    columns = read_snapshot(DB_PATH)
+    if columns is not None:
+        return CandidateTable(**columns)
+
     try:
         df = pd.read_csv(DB_PATH, encoding='utf-8').dropna(how='all')
     except FileNotFoundError:
         print(f"Файл базы знаний не найден по пути: {DB_PATH}")
         print("Создайте файл и добавьте заголовки.")
-        return []
+        return CandidateTable.empty()
     except Exception as e:
         print(f"Ошибка чтения CSV: {e}")
-        return []
-
-    cols = list(df.columns)
-    col_name = find_column(cols, "name")
-    col_lang = find_column(cols, "language")
-    col_level = find_column(cols, "level")
-    col_years = find_column(cols, "years")
-    col_format = find_column(cols, "format")
-    col_salary = find_column(cols, "salary")
-
-    candidates = []
-    for _, row in df.iterrows():
-        name = str(row[col_name]).strip()
-        if not name or name.lower() == "nan":
-            continue
-
-        # Язык и формат могут быть списками, разделяемыми запятой
-        lang_str = str(row[col_lang])
-        langs = [l.strip() for l in lang_str.split(',')] if pd.notna(row[col_lang]) else []
-        fmt_str = str(row[col_format])
-        formats = [f.strip() for f in fmt_str.split(',')] if pd.notna(row[col_format]) else []
-
-        try:
-            years = int(row[col_years])
-        except (ValueError, TypeError):
-            years = 0
-        try:
-            salary = int(row[col_salary])
-        except (ValueError, TypeError):
-            salary = 0
-
-        level = str(row[col_level]).strip()
-
-        candidates.append(Candidate(
-            name=name,
-            language=langs,
-            level=level,
-            years=years,
-            format=formats,
-            salary=salary
-        ))
-    return candidates
+        return CandidateTable.empty()
+
+    table = CandidateTable.from_frame(df)
+    write_snapshot(DB_PATH, table.columns())
+    return table
+
+def iter_candidates(chunksize: int = CHUNK_SIZE) -> Iterator[CandidateTable]:
+    """Потоково читает CSV пачками по chunksize строк.
+
+    В памяти одновременно находится только одна пачка, поэтому базу
+    больше оперативной памяти можно отфильтровать за один проход.
+    """
+    try:
+        reader = pd.read_csv(DB_PATH, encoding='utf-8', chunksize=chunksize)
+    except FileNotFoundError:
+        print(f"Файл базы знаний не найден по пути: {DB_PATH}")
+        print("Создайте файл и добавьте заголовки.")
+        return
+    except Exception as e:
+        print(f"Ошибка чтения CSV: {e}")
+        return
+
+    with reader:
+        for chunk in reader:
+            chunk = chunk.dropna(how='all')
+            if len(chunk):
+                yield CandidateTable.from_frame(chunk)
+
+def flatten_candidates(source: Iterable) -> Iterator[Candidate]:
+    """Разворачивает последовательность кандидатов и/или пачек CandidateTable."""
+    for item in source:
+        if isinstance(item, CandidateTable):
+            yield from item
+        else:
+            yield item
+
+# Подписчики на кандидатов, дописанных в базу знаний (например, CandidateIndex)
+_save_listeners: List[Callable[[Candidate], None]] = []
+
+# Версия базы знаний: растёт при каждой записи, по ней сбрасываются кэши
+_store_version = 0
+
+def store_version() -> int:
+    return _store_version
+
+def bump_store_version():
+    global _store_version
+    _store_version += 1
+
+def add_save_listener(listener: Callable[[Candidate], None]):
+    _save_listeners.append(listener)
+
+def remove_save_listener(listener: Callable[[Candidate], None]):
+    if listener in _save_listeners:
+        _save_listeners.remove(listener)
+
+class CandidateWriter:
+    """Буферизованная дозапись кандидатов в CSV с групповой фиксацией.
+
+    Строки копятся в буфере и записываются одним вызовом writerows, когда
+    набирается batch_size строк или с прошлой фиксации прошло больше
+    flush_interval секунд. Интервал проверяется только в write(): фонового
+    таймера нет (подписчики записи, например CandidateIndex, вызываются в
+    потоке writer), поэтому неполная пачка без последующих записей остаётся
+    в буфере до flush() или close(). save_candidate пишет с batch_size=1,
+    то есть каждая строка фиксируется сразу. Если файл уже существует,
+    столбцы сопоставляются с его заголовком через COLUMN_ALIASES.
+    """
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = WRITE_BATCH_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL):
+        self.path = path or DB_PATH
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer: List[List[Any]] = []
+        self._candidates: List[Candidate] = []
+        self._layout: Optional[List[Optional[str]]] = None
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> "CandidateWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, candidate: Candidate):
+        if self._layout is None:
+            self._layout = self._resolve_layout()
+        values = {
+            "name": candidate.name,
+            "language": ", ".join(candidate.language),
+            "level": candidate.level,
+            "years": candidate.years,
+            "format": ", ".join(candidate.format),
+            "salary": candidate.salary
+        }
+        self._buffer.append([values[key] if key else "" for key in self._layout])
+        self._candidates.append(candidate)
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def write_many(self, candidates: Iterable[Candidate]):
+        for candidate in flatten_candidates(candidates):
+            self.write(candidate)
+
+    def flush(self):
+        """Фиксирует накопленную пачку: одна запись и один fsync на пачку."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator=os.linesep).writerows(self._buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        self.written += len(self._buffer)
+        self._buffer.clear()
+        invalidate_snapshot(self.path)
+
+        # Уведомляем подписчиков только о записи в саму базу знаний
+        if os.path.abspath(self.path) == os.path.abspath(DB_PATH):
+            bump_store_version()
+            for candidate in self._candidates:
+                for listener in _save_listeners:
+                    listener(candidate)
+        self._candidates.clear()
+
+    def close(self):
+        self.flush()
+
+    def _resolve_layout(self) -> List[Optional[str]]:
+        """Порядок канонических полей в строке CSV.
+
+        Для нового файла пишется заголовок из канонических имён, для
+        существующего — берётся его заголовок с учётом синонимов.
+        """
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            layout = list(COLUMN_ALIASES)
+            with open(self.path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f, lineterminator=os.linesep).writerow(layout)
+            return layout
+
+        with open(self.path, newline='', encoding='utf-8-sig') as f:
+            header = next(csv.reader(f), [])
+        by_column = {find_column(header, key): key for key in COLUMN_ALIASES}
+
+        # Дописываем перевод строки, если файл им не заканчивается
+        with open(self.path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) not in (b"\n", b"\r"):
+                f.write(b"\n")
+        return [by_column.get(col) for col in header]
+
+def bulk_save_candidates(candidates: Iterable[Candidate], batch_size: int = WRITE_BATCH_SIZE) -> int:
+    """Массово дописывает кандидатов в базу знаний; возвращает их число."""
+    with CandidateWriter(batch_size=batch_size) as writer:
+        writer.write_many(candidates)
+    print(f"В базу знаний добавлено кандидатов: {writer.written}")
+    return writer.written
 
 def save_candidate(candidate: Candidate):
     """Сохраняет нового кандидата в CSV файл."""
-    import os
-    # Проверяем, существует ли файл
-    file_exists = os.path.isfile(DB_PATH)
-
-    # Создаем DataFrame с новым кандидатом
-    new_row = {
-        "name": candidate.name,
-        "language": ", ".join(candidate.language),
-        "level": candidate.level,
-        "years": candidate.years,
-        "format": ", ".join(candidate.format),
-        "salary": candidate.salary
-    }
-    df = pd.DataFrame([new_row])
-
-    # Сохраняем в CSV
-    df.to_csv(DB_PATH, mode='a', header=not file_exists, index=False, encoding='utf-8')
-    print(f"Кандидат '{candidate.name}' успешно добавлен в базу знаний.")
\ No newline at end of file
+    with CandidateWriter(batch_size=1) as writer:
+        writer.write(candidate)
+    print(f"Кандидат '{candidate.name}' успешно добавлен в базу знаний.")
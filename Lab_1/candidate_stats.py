@@ -0,0 +1,112 @@
+# candidate_stats.py
+"""Статистика по атрибутам базы кандидатов для оценки селективности фильтров."""
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+# До такого числа различных значений гистограмма хранит точные частоты
+MAX_EXACT_VALUES = 1024
+HISTOGRAM_BINS = 64
+
+
+class Histogram:
+    """Гистограмма числового атрибута.
+
+    При небольшом числе различных значений хранит точные частоты, иначе —
+    равноширокие корзины с линейной интерполяцией внутри корзины.
+    """
+
+    def __init__(self, values: np.ndarray):
+        uniq, counts = np.unique(values, return_counts=True)
+        self.cardinality = len(uniq)
+        self.min = uniq[0] if len(uniq) else 0
+        self.max = uniq[-1] if len(uniq) else 0
+        self.exact = len(uniq) <= MAX_EXACT_VALUES
+        if self.exact:
+            self.edges = uniq
+            self.counts = counts
+            self._cumulative = np.concatenate([[0], np.cumsum(counts)])
+        else:
+            self.counts, self.edges = np.histogram(values, bins=HISTOGRAM_BINS)
+
+    def covers(self, low: float, high: float) -> bool:
+        """Все значения атрибута лежат в [low, high]."""
+        return low <= self.min and self.max <= high
+
+    def estimate(self, low: float, high: float) -> float:
+        """Оценка числа строк со значением в [low, high]."""
+        if self.exact:
+            lo = np.searchsorted(self.edges, low, side="left")
+            hi = np.searchsorted(self.edges, high, side="right")
+            return float(self._cumulative[hi] - self._cumulative[lo])
+        left, right = self.edges[:-1], self.edges[1:]
+        overlap = np.clip(np.minimum(high, right) - np.maximum(low, left), 0, None)
+        width = np.where(right > left, right - left, 1)
+        return float(np.sum(self.counts * np.minimum(overlap / width, 1.0)))
+
+
+@dataclass
+class CandidateStats:
+    """Частоты значений и гистограммы атрибутов одной таблицы кандидатов."""
+    rows: int
+    language_counts: Dict[str, int]
+    format_counts: Dict[str, int]
+    level_counts: Dict[str, int]
+    years: Histogram
+    salary: Histogram
+
+    @classmethod
+    def from_table(cls, table) -> "CandidateStats":
+        return cls(
+            rows=len(table),
+            language_counts=_value_counts(table.language_codes, table.language_vocab),
+            format_counts=_value_counts(table.format_codes, table.format_vocab),
+            level_counts=_value_counts(table.level_codes, [v.lower() for v in table.level_vocab]),
+            years=Histogram(np.asarray(table.years)),
+            salary=Histogram(np.asarray(table.salary)),
+        )
+
+    @property
+    def cardinalities(self) -> Dict[str, int]:
+        return {
+            "languages": len(self.language_counts),
+            "formats": len(self.format_counts),
+            "level": len(self.level_counts),
+            "years": self.years.cardinality,
+            "salary": self.salary.cardinality,
+        }
+
+
+@dataclass
+class TableCodes:
+    """Различные значения атрибутов таблицы и номера этих значений по строкам.
+
+    Условия и множители профилей считаются один раз на различное значение
+    (масок, стажа, зарплаты обычно немного), а на строки раскладываются
+    выборкой по номерам.
+    """
+    language_values: np.ndarray
+    language_inverse: np.ndarray
+    format_values: np.ndarray
+    format_inverse: np.ndarray
+    years_values: np.ndarray
+    years_inverse: np.ndarray
+    salary_values: np.ndarray
+    salary_inverse: np.ndarray
+
+    @classmethod
+    def from_table(cls, table) -> "TableCodes":
+        lang, lang_inv = np.unique(table.language_masks, return_inverse=True)
+        fmt, fmt_inv = np.unique(table.format_masks, return_inverse=True)
+        years, years_inv = np.unique(table.years, return_inverse=True)
+        salary, salary_inv = np.unique(table.salary, return_inverse=True)
+        return cls(lang, lang_inv.ravel(), fmt, fmt_inv.ravel(),
+                   years, years_inv.ravel(), salary, salary_inv.ravel())
+
+
+def _value_counts(codes: np.ndarray, vocab) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for value, count in zip(vocab, np.bincount(codes, minlength=len(vocab)).tolist()):
+        counts[value] = counts.get(value, 0) + count
+    return counts
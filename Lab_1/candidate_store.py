@@ -0,0 +1,298 @@
+# candidate_store.py
+"""Хранилища базы знаний кандидатов.
+
+CsvCandidateStore работает с CSV файлом через candidate_manager,
+SqliteCandidateStore хранит кандидатов в SQLite: уровень, стаж и зарплата
+проиндексированы, языки и форматы вынесены в отдельные таблицы связей,
+а фильтры классического подбора выполняются как SQL WHERE. Точки входа
+открывают хранилище, выбранное в config.STORAGE_BACKEND, через open_store.
+"""
+import math
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from config import SQLITE_PATH, STORAGE_BACKEND, WRITE_BATCH_SIZE
+import candidate_manager
+from candidate_manager import (
+    Candidate,
+    CandidateTable,
+    CandidateWriter,
+    FORMAT_VOCAB,
+    LANGUAGE_VOCAB,
+    bulk_save_candidates,
+    bump_store_version,
+    flatten_candidates,
+    iter_candidates,
+    load_candidates,
+    save_candidate,
+)
+from vocab_search import pref_groups
+
+# Разделитель значений при склейке списков в SQL (не встречается в данных)
+_SEP = "\x1f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    level TEXT NOT NULL,
+    level_key TEXT NOT NULL,
+    years INTEGER NOT NULL,
+    salary INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_level ON candidates(level_key);
+CREATE INDEX IF NOT EXISTS idx_candidates_years ON candidates(years);
+CREATE INDEX IF NOT EXISTS idx_candidates_salary ON candidates(salary);
+
+CREATE TABLE IF NOT EXISTS candidate_languages (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    value TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_languages_value ON candidate_languages(value, candidate_id);
+
+CREATE TABLE IF NOT EXISTS candidate_formats (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    value TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_formats_value ON candidate_formats(value, candidate_id);
+"""
+
+
+def _select_sql(sep: str) -> str:
+    return f"""
+SELECT c.name,
+       (SELECT group_concat(value, '{sep}') FROM candidate_languages WHERE candidate_id = c.id),
+       c.level,
+       c.years,
+       (SELECT group_concat(value, '{sep}') FROM candidate_formats WHERE candidate_id = c.id),
+       c.salary
+FROM candidates c
+"""
+
+_SELECT = _select_sql(_SEP)
+
+
+class CsvCandidateStore:
+    """Хранилище на CSV файле config.DB_PATH (поведение по умолчанию)."""
+
+    @property
+    def path(self) -> str:
+        # DB_PATH может быть переопределён ключом --db после импорта
+        return candidate_manager.DB_PATH
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "CsvCandidateStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[CandidateTable]:
+        return iter_candidates()
+
+    def load(self) -> CandidateTable:
+        return load_candidates()
+
+    def add(self, candidate: Candidate):
+        save_candidate(candidate)
+
+    def add_many(self, candidates: Iterable[Candidate]) -> int:
+        return bulk_save_candidates(candidates)
+
+
+class SqliteCandidateStore:
+    """Хранилище кандидатов в SQLite с индексами по уровню, стажу и зарплате."""
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "SqliteCandidateStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Candidate]:
+        cursor = self.conn.execute(_SELECT + " ORDER BY c.id")
+        while True:
+            rows = cursor.fetchmany(WRITE_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield _row_to_candidate(row)
+
+    def load(self) -> CandidateTable:
+        """Загружает всю базу в колоночную таблицу."""
+        # Списки склеиваются через запятую, как в CSV, и разбираются from_frame
+        df = pd.read_sql_query(_select_sql(",") + " ORDER BY c.id", self.conn)
+        df.columns = ["name", "language", "level", "years", "format", "salary"]
+        if df.empty:
+            return CandidateTable.empty()
+        return CandidateTable.from_frame(df)
+
+    def add(self, candidate: Candidate):
+        self.add_many([candidate])
+        print(f"Кандидат '{candidate.name}' успешно добавлен в базу знаний.")
+
+    def add_many(self, candidates: Iterable[Candidate]) -> int:
+        """Добавляет кандидатов одной транзакцией на пачку."""
+        count = 0
+        batch: List[Candidate] = []
+        for candidate in flatten_candidates(candidates):
+            batch.append(candidate)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                count += self._insert(batch)
+                batch = []
+        if batch:
+            count += self._insert(batch)
+        return count
+
+    def _insert(self, batch: List[Candidate]) -> int:
+        with self.conn:
+            start = self.conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM candidates").fetchone()[0]
+            ids = range(start, start + len(batch))
+            self.conn.executemany(
+                "INSERT INTO candidates (id, name, level, level_key, years, salary) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(cid, c.name, c.level, c.level.lower(), int(c.years), int(c.salary))
+                 for cid, c in zip(ids, batch)],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO candidate_languages VALUES (?, ?)",
+                [(cid, value) for cid, c in zip(ids, batch) for value in c.language],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO candidate_formats VALUES (?, ?)",
+                [(cid, value) for cid, c in zip(ids, batch) for value in c.format],
+            )
+        bump_store_version()
+        return len(batch)
+
+    def query(self, profile: Dict[str, Any], flags: Dict[str, bool]) -> List[Candidate]:
+        """Классический подбор: все фильтры профиля выполняются в SQLite."""
+        if flags["relaxed"]:
+            # Нечёткий поиск идёт по словарям, поэтому они должны знать все значения базы
+            for table, vocab in (("candidate_languages", LANGUAGE_VOCAB),
+                                 ("candidate_formats", FORMAT_VOCAB)):
+                for (value,) in self.conn.execute(f"SELECT DISTINCT value FROM {table}"):
+                    vocab.intern(value)
+        where, params = _classic_where(profile, flags)
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY c.id"
+        return [_row_to_candidate(row) for row in self.conn.execute(sql, params)]
+
+    def import_csv(self, csv_path: Optional[str] = None) -> int:
+        """Импортирует кандидатов из CSV базы знаний."""
+        if csv_path is None:
+            return self.add_many(iter_candidates())
+        return self.add_many(CandidateTable.from_frame(chunk.dropna(how='all'))
+                             for chunk in pd.read_csv(csv_path, encoding='utf-8',
+                                                      chunksize=WRITE_BATCH_SIZE))
+
+    def export_csv(self, csv_path: str) -> int:
+        """Выгружает всех кандидатов в CSV (с заголовком при создании файла)."""
+        with CandidateWriter(path=csv_path) as writer:
+            writer.write_many(self)
+        return writer.written
+
+
+def _row_to_candidate(row: Tuple) -> Candidate:
+    name, langs, level, years, formats, salary = row
+    return Candidate(
+        name=name,
+        language=langs.split(_SEP) if langs else [],
+        level=level,
+        years=years,
+        format=formats.split(_SEP) if formats else [],
+        salary=salary,
+    )
+
+
+def _classic_where(profile: Dict[str, Any], flags: Dict[str, bool]) -> Tuple[List[str], List[Any]]:
+    """Строит условия WHERE, эквивалентные фильтрам classic_recommend."""
+    where: List[str] = []
+    params: List[Any] = []
+
+    for table, vocab, prefs in (("candidate_languages", LANGUAGE_VOCAB, profile["languages"]),
+                                ("candidate_formats", FORMAT_VOCAB, profile["formats"])):
+        if not prefs:
+            continue
+        # Значения словаря для каждого значения профиля (в мягком режиме их несколько)
+        groups = {tuple(sorted(vocab.decode(g)))
+                  for g in pref_groups(vocab, prefs, flags["relaxed"])}
+        values = sorted({v for group in groups for v in group})
+        if flags["all"] and all(len(group) == 1 for group in groups):
+            marks = ", ".join("?" * len(values))
+            where.append(f"(SELECT COUNT(*) FROM {table} WHERE candidate_id = c.id "
+                         f"AND value IN ({marks})) = ?")
+            params.extend(values)
+            params.append(len(values))
+        else:
+            for group in (sorted(groups) if flags["all"] else [values]):
+                marks = ", ".join("?" * len(group))
+                where.append(f"EXISTS (SELECT 1 FROM {table} WHERE candidate_id = c.id "
+                             f"AND value IN ({marks}))")
+                params.extend(group)
+
+    if profile["level"]:
+        where.append("c.level_key = ?")
+        params.append(profile["level"])
+
+    for column, (low, high) in (("c.years", profile["years_range"]),
+                                ("c.salary", profile["salary_range"])):
+        if low > -math.inf:
+            where.append(f"{column} >= ?")
+            params.append(low)
+        if high < math.inf:
+            where.append(f"{column} <= ?")
+            params.append(high)
+    return where, params
+
+
+def open_store(backend: str = STORAGE_BACKEND):
+    """Открывает хранилище выбранного в config типа ("csv" или "sqlite")."""
+    if backend == "sqlite":
+        store = SqliteCandidateStore()
+        if not len(store) and os.path.exists(candidate_manager.DB_PATH):
+            # Однократный перенос CSV базы в пустую базу SQLite
+            count = store.import_csv()
+            print(f"Перенесено кандидатов из {candidate_manager.DB_PATH} в {store.path}: {count}")
+        return store
+    return CsvCandidateStore()
+
+
+def store_files(backend: str = STORAGE_BACKEND) -> List[str]:
+    """Файлы хранилища, по изменению которых видно запись в базу."""
+    if backend == "sqlite":
+        return [SQLITE_PATH, SQLITE_PATH + "-wal"]
+    return [candidate_manager.DB_PATH]
+
+
+def load_from_store() -> CandidateTable:
+    """Загружает всю базу из хранилища config.STORAGE_BACKEND."""
+    with open_store() as store:
+        return store.load()
+
+
+def save_to_store(candidate: Candidate):
+    """Добавляет кандидата в хранилище config.STORAGE_BACKEND."""
+    with open_store() as store:
+        store.add(candidate)
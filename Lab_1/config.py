@@ -6,6 +6,41 @@ DB_PATH = os.path.join(
     os.path.dirname(os.path.abspath(__file__)), "data", "candidates.csv"
 )
 
+# Хранилище базы знаний: "csv" (DB_PATH) или "sqlite" (SQLITE_PATH)
+STORAGE_BACKEND = "csv"
+SQLITE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "candidates.sqlite3"
+)
+
+# Хранилище онтологии Lab_2: "turtle" (граф в памяти, файл .ttl) или
+# "sqlite" (граф открывается прямо в файле .sqlite3 рядом с .ttl)
+ONTOLOGY_BACKEND = "turtle"
+
+# Суффикс бинарного снимка базы знаний (хранится рядом с CSV)
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Размер пачки строк при потоковом чтении базы знаний
+CHUNK_SIZE = 100_000
+
+# Групповая фиксация при дозаписи: размер пачки строк и максимальная задержка (сек.);
+# задержка проверяется при следующей записи, неполная пачка фиксируется в close()
+WRITE_BATCH_SIZE = 10_000
+WRITE_FLUSH_INTERVAL = 1.0
+
+# Сколько результатов подбора хранит LRU-кэш expert_system.recommend
+RESULT_CACHE_SIZE = 128
+
+# Бюджет памяти (байт) на блок матрицы "профили x кандидаты" в recommend_many
+MATCH_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Параллельный подбор: число процессов (None — по числу ядер) и шардов на процесс
+PARALLEL_WORKERS = None
+SHARDS_PER_WORKER = 4
+
+# Число процессов пула подбора в main.py, batch_cli и сервере Lab_3
+# (0 — подбор в основном процессе); переопределяется ключом --workers N
+RECOMMEND_WORKERS = 0
+
 # Допустимые значения для атрибутов
 LANGUAGES = [
     "Python",
@@ -62,4 +97,6 @@ FLAGS = {
     "all": "--all",
     "why": "--why",
     "bayes": "--bayes",
+    "explain": "--explain",
+    "workers": "--workers",
 }
@@ -0,0 +1,146 @@
+# elimination_funnel.py
+"""Диагностика классического подбора (--why): воронка отсева кандидатов.
+
+Для каждой пачки кандидатов все условия профиля вычисляются векторно
+над всеми строками (без раннего выхода), и по этим маскам за тот же
+проход считается:
+- сколько кандидатов отсеял бы каждый критерий сам по себе;
+- сколько отсеял каждый критерий по цепочке (среди прошедших предыдущие);
+- ближайшие промахи — кандидаты, не прошедшие только один критерий,
+  для стажа и зарплаты упорядоченные по удалённости от диапазона.
+"""
+import heapq
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from config import CHUNK_SIZE
+from candidate_manager import Candidate, CandidateTable
+from query_planner import active_criteria, criterion_match
+
+# Сколько ближайших промахов хранится на каждый критерий
+NEAREST_MISSES = 3
+
+CRITERIA_LABELS = {
+    "languages": "Языки",
+    "level": "Уровень",
+    "years": "Стаж",
+    "formats": "Формат",
+    "salary": "Зарплата",
+}
+
+
+class EliminationFunnel:
+    """Счётчики отсева по критериям, накапливаемые по пачкам кандидатов."""
+
+    def __init__(self, profile: Dict[str, Any], flags: Dict[str, bool]):
+        self.profile = profile
+        self.flags = flags
+        self.criteria = active_criteria(profile)
+        self.total = 0
+        self.passed = 0
+        self.alone = {c: 0 for c in self.criteria}
+        self.cumulative = {c: 0 for c in self.criteria}
+        # (удалённость, порядковый номер, кандидат) — куча с обратным знаком
+        self._misses: Dict[str, List[Tuple[float, int, Candidate]]] = {c: [] for c in self.criteria}
+
+    def add(self, table: CandidateTable, batch: Sequence[Candidate]) -> np.ndarray:
+        """Учитывает пачку; возвращает номера строк, прошедших все условия."""
+        n = len(table)
+        rows = np.arange(n)
+        masks = {c: criterion_match(table, c, rows, self.profile, self.flags) for c in self.criteria}
+        failed = np.zeros(n, dtype=np.int32)
+        alive = np.ones(n, dtype=bool)
+        for c in self.criteria:
+            miss = ~masks[c]
+            self.alone[c] += int(miss.sum())
+            self.cumulative[c] += int((alive & miss).sum())
+            alive &= masks[c]
+            failed += miss
+
+        for c in self.criteria:
+            only = np.flatnonzero(~masks[c] & (failed == 1))
+            if not len(only):
+                continue
+            distance = self._distance(table, c, only)
+            nearest = only[np.argsort(distance, kind="stable")[:NEAREST_MISSES]]
+            for row, d in zip(nearest, np.sort(distance, kind="stable")[:NEAREST_MISSES]):
+                entry = (-float(d), -(self.total + int(row)), batch[int(row)])
+                heap = self._misses[c]
+                if len(heap) < NEAREST_MISSES:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+
+        self.total += n
+        passed = np.flatnonzero(alive)
+        self.passed += len(passed)
+        return passed
+
+    def nearest_misses(self, criterion: str) -> List[Candidate]:
+        return [c for _, _, c in sorted(self._misses[criterion], key=lambda e: e[:2], reverse=True)]
+
+    def _distance(self, table: CandidateTable, criterion: str, rows: np.ndarray) -> np.ndarray:
+        if criterion not in ("years", "salary"):
+            return np.zeros(len(rows))
+        values = (table.years if criterion == "years" else table.salary)[rows]
+        low, high = self.profile[f"{criterion}_range"]
+        return np.maximum(np.maximum(low - values, values - high), 0).astype(float)
+
+    def format(self) -> str:
+        """Текстовый отчёт для режима --why."""
+        lines = [
+            "\n--- Диагностика подбора (--why) ---",
+            f"Проверено кандидатов: {self.total}, подошло: {self.passed}",
+            f"{'Критерий':<10} | {'отсеял бы сам':>13} | {'отсеян по цепочке':>17}",
+        ]
+        for c in self.criteria:
+            lines.append(f"{CRITERIA_LABELS[c]:<10} | {self.alone[c]:>13} | {self.cumulative[c]:>17}")
+        misses = [(c, self.nearest_misses(c)) for c in self.criteria if self._misses[c]]
+        if misses:
+            lines.append("Ближайшие промахи (не прошли только этот критерий):")
+        for c, candidates in misses:
+            described = ", ".join(f"{x.name} ({self._describe(c, x)})" for x in candidates)
+            lines.append(f"  {CRITERIA_LABELS[c]}: {described}")
+        return "\n".join(lines)
+
+    def _describe(self, criterion: str, c: Candidate) -> str:
+        if criterion == "languages":
+            return ", ".join(c.language) or "языки не указаны"
+        if criterion == "formats":
+            return ", ".join(c.format) or "формат не указан"
+        if criterion == "level":
+            return c.level
+        if criterion == "years":
+            return f"стаж {c.years} лет"
+        return f"зарплата {c.salary} руб."
+
+
+def diagnose(candidates: Iterable, profile: Dict[str, Any],
+             flags: Dict[str, bool]) -> Tuple[List[Candidate], EliminationFunnel]:
+    """Классический подбор с воронкой отсева за один проход по базе."""
+    funnel = EliminationFunnel(profile, flags)
+    if isinstance(candidates, CandidateTable):
+        candidates = [candidates]
+    results: List[Candidate] = []
+    chunk: List[Candidate] = []
+
+    def flush_chunk():
+        # Объекты Candidate проверяются через временную таблицу, но в
+        # результат попадают сами исходные объекты
+        passed = funnel.add(CandidateTable.from_candidates(chunk), chunk)
+        results.extend(chunk[i] for i in passed)
+        chunk.clear()
+
+    for item in candidates:
+        if isinstance(item, CandidateTable):
+            if chunk:
+                flush_chunk()
+            results.extend(item[int(i)] for i in funnel.add(item, item))
+            continue
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            flush_chunk()
+    if chunk:
+        flush_chunk()
+    return results, funnel
@@ -1,6 +1,20 @@
 # expert_system.py
-from typing import List, Dict, Any, Tuple
-from candidate_manager import Candidate
+import heapq
+import math
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+import numpy as np
+from config import CHUNK_SIZE, MATCH_MEMORY_BUDGET
+from candidate_manager import (
+    Candidate, CandidateTable, LANGUAGE_VOCAB, FORMAT_VOCAB,
+)
+from candidate_store import SqliteCandidateStore
+from candidate_index import CandidateIndex
+from query_planner import QueryPlan, execute_plan, merge_plans, plan_query
+from result_cache import ResultCache, profile_key
+from vocab_search import pref_groups
+from elimination_funnel import diagnose
+from batch_matcher import ProfileMatrix, bayes_matrix, blocks, classic_matrix
+from likelihood import candidate_log_score, log_scores
 
 
 # ---------------------------------------------------------------------------
@@ -9,69 +23,124 @@ from candidate_manager import Candidate
 
 
 def bayesian_score(c: Candidate, profile: Dict[str, Any]) -> float:
-    """Вычисляет баесовскую вероятность соответствия кандидата профилю."""
-    p = 1.0
-
-    # Язык
-    if profile["languages"]:
-        match = any(
-            lang.lower() in [l.lower() for l in c.language]
-            for lang in profile["languages"]
-        )
-        p *= 0.9 if match else 0.5
-
-    # Уровень
-    if profile["level"]:
-        p *= 0.8 if c.level.lower() == profile["level"].lower() else 0.6
-
-    # Опыт
-    min_y, max_y = profile["years_range"]
-    if min_y <= c.years <= max_y:
-        p *= 0.9
-    elif abs(c.years - min_y) <= 2 or abs(c.years - max_y) <= 2:
-        p *= 0.7
-    else:
-        p *= 0.5
-
-    # Формат
-    if profile["formats"]:
-        match = any(
-            fmt.lower() in [f.lower() for f in c.format] for fmt in profile["formats"]
-        )
-        p *= 0.8 if match else 0.6
-
-    # Зарплата
-    min_s, max_s = profile["salary_range"]
-    if min_s <= c.salary <= max_s:
-        p *= 0.9
-    else:
-        if max_s == float("inf"):
-            diff_factor = 0.7 if c.salary >= min_s else 0.4
+    """Вычисляет баесовскую вероятность соответствия кандидата профилю.
+
+    Множители берутся из таблиц правдоподобия (см. likelihood); для
+    оценки многих кандидатов используйте log_scores по таблице.
+    """
+    return float(np.exp(candidate_log_score(c, profile)))
+
+
+def _score_batches(candidates: Iterable, profile: Dict[str, Any]) -> Iterator[Tuple[Sequence[Candidate], np.ndarray]]:
+    """Логарифмы оценок по пачкам; объекты Candidate собираются во временные таблицы."""
+    if isinstance(candidates, CandidateTable):
+        candidates = [candidates]
+    chunk: List[Candidate] = []
+    for item in candidates:
+        if isinstance(item, CandidateTable):
+            yield item, log_scores(item, profile)
+            continue
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            yield chunk, log_scores(CandidateTable.from_candidates(chunk), profile)
+            chunk = []
+    if chunk:
+        yield chunk, log_scores(CandidateTable.from_candidates(chunk), profile)
+
+
+def _top_k_indices(probs: np.ndarray, k: int) -> np.ndarray:
+    """Индексы k наибольших значений в исходном порядке следования.
+
+    Выбор за O(n) через np.argpartition; при равенстве на границе берутся
+    более ранние элементы, как при устойчивой сортировке.
+    """
+    if k >= len(probs):
+        return np.arange(len(probs))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = probs[np.argpartition(probs, len(probs) - k)[len(probs) - k]]
+    above = np.flatnonzero(probs > kth)
+    ties = np.flatnonzero(probs == kth)[:k - len(above)]
+    return np.sort(np.concatenate([above, ties]))
+
+
+class _BayesRanking:
+    """Накопитель результатов bayesian_recommend, заполняемый по пачкам.
+
+    Оценки хранятся логарифмами. Хранятся только кандидаты, которые ещё
+    могут пройти порог относительно текущего максимума; при заданном
+    top_k — не более top_k на пачку.
+    """
+
+    def __init__(self, threshold: float, top_k: Optional[int]):
+        self.threshold = threshold
+        self.log_threshold = math.log(threshold) if threshold > 0 else -math.inf
+        self.top_k = top_k
+        self.kept: List[Candidate] = []
+        self.kept_scores: List[np.ndarray] = []
+        self.max_score = -math.inf
+
+    def add(self, batch: Sequence[Candidate], scores: np.ndarray, rows: Optional[np.ndarray] = None):
+        """Учитывает логарифмы оценок scores строк batch (или batch[rows], если заданы)."""
+        if not len(scores):
+            return
+        log_threshold, top_k = self.log_threshold, self.top_k
+        batch_max = float(scores.max())
+        if batch_max > self.max_score:
+            self.max_score = batch_max
+            if self.kept:
+                old_scores = np.concatenate(self.kept_scores)
+                survivors = np.flatnonzero(old_scores - self.max_score >= log_threshold)
+                self.kept = [self.kept[i] for i in survivors]
+                self.kept_scores = [old_scores[survivors]]
+        passed = np.flatnonzero(scores - self.max_score >= log_threshold)
+        if top_k is not None:
+            passed = passed[_top_k_indices(scores[passed], top_k)]
+        if rows is not None:
+            passed_rows = rows[passed]
+        else:
+            passed_rows = passed
+        self.kept.extend(batch[int(i)] for i in passed_rows)
+        self.kept_scores.append(scores[passed])
+
+        # Частичные top-k списки сливаются, как только их становится много
+        if top_k is not None and len(self.kept) > 2 * top_k:
+            old_scores = np.concatenate(self.kept_scores)
+            best = _top_k_indices(old_scores, top_k)
+            self.kept = [self.kept[i] for i in best]
+            self.kept_scores = [old_scores[best]]
+
+    def result(self) -> List[Tuple[Candidate, float]]:
+        # Нормализация (чтобы лучший был = 1.0)
+        scores = np.concatenate(self.kept_scores) if self.kept_scores else np.empty(0)
+        passed = np.flatnonzero(scores - self.max_score >= self.log_threshold)
+        probs = np.exp(scores - self.max_score)
+
+        # Сортировка по убыванию вероятности (устойчивая, как list.sort)
+        if self.top_k is not None:
+            order = heapq.nlargest(self.top_k, passed, key=scores.__getitem__)
         else:
-            diff = abs(c.salary - min_s if c.salary < min_s else c.salary - max_s)
-            diff_factor = 0.7 if diff / max_s < 0.2 else 0.4
-        p *= diff_factor
+            order = passed[np.argsort(-scores[passed], kind="stable")]
 
-    return p
+        return [(self.kept[i], float(probs[i])) for i in order]
 
 
-def bayesian_recommend(candidates: List[Candidate], profile: Dict[str, Any], threshold: float = 0.3) -> List[Tuple[Candidate, float]]:
+def bayesian_recommend(candidates: Iterable, profile: Dict[str, Any], threshold: float = 0.3,
+                       top_k: Optional[int] = None) -> List[Tuple[Candidate, float]]:
     """Рекомендация кандидатов на основе Баесовского подхода.
     
     Возвращает список кортежей (Candidate, вероятность) только для кандидатов,
-    которые прошли порог threshold.
+    которые прошли порог threshold. Принимает как список кандидатов, так и
+    таблицу или поток пачек из iter_candidates (они оцениваются векторно).
+    Хранятся только кандидаты, которые ещё могут пройти порог относительно
+    текущего максимума. При заданном top_k возвращаются только top_k лучших:
+    порог применяется до упорядочивания, а в памяти остаётся не более top_k
+    кандидатов на пачку.
     """
-    scored = [(c, bayesian_score(c, profile)) for c in candidates]
-
-    # Нормализация (чтобы лучший был = 1.0)
-    max_prob = max((p for _, p in scored), default=1e-6)
-    scored = [(c, p / max_prob) for c, p in scored]
-
-    # Сортировка по убыванию вероятности
-    scored.sort(key=lambda x: x[1], reverse=True)
-
-    # Возвращаем только тех, кто набрал >= threshold
-    return [(c, p) for c, p in scored if p >= threshold]
+    ranking = _BayesRanking(threshold, top_k)
+    for batch, scores in _score_batches(candidates, profile):
+        ranking.add(batch, scores)
+    return ranking.result()
 
 
 # ---------------------------------------------------------------------------
@@ -79,35 +148,74 @@ def bayesian_recommend(candidates: List[Candidate], profile: Dict[str, Any], thr
 # ---------------------------------------------------------------------------
 
 
-def check_pref(
-    item_list: List[str], prefs: List[str], relaxed: bool, require_all: bool
-) -> bool:
-    if not prefs:
+def check_pref(item_mask: int, pref_groups: Sequence[int], require_all: bool) -> bool:
+    """Проверяет маску значений кандидата против масок предпочтений.
+
+    pref_groups — по маске на каждое значение профиля (см. pref_groups):
+    в мягком режиме одна маска покрывает все найденные варианты значения.
+    """
+    if not pref_groups:
         return True
     if require_all:
-        return set(prefs).issubset(set(item_list))
+        return all(item_mask & group for group in pref_groups)
     else:
-        return bool(set(prefs) & set(item_list))
+        return any(item_mask & group for group in pref_groups)
+
+
+def _classic_match(c: Candidate, profile: Dict[str, Any], flags: Dict[str, bool],
+                   lang_groups: List[int], fmt_groups: List[int]) -> bool:
+    if not check_pref(c.language_mask, lang_groups, flags["all"]):
+        return False
+    if profile["level"] and profile["level"] != c.level.lower():
+        return False
+    if not (profile["years_range"][0] <= c.years <= profile["years_range"][1]):
+        return False
+    if not check_pref(c.format_mask, fmt_groups, flags["all"]):
+        return False
+    return profile["salary_range"][0] <= c.salary <= profile["salary_range"][1]
 
 
 def classic_recommend(
-    candidates: List[Candidate], profile: Dict[str, Any], flags: Dict[str, bool]
+    candidates: Iterable, profile: Dict[str, Any], flags: Dict[str, bool],
+    explain: bool = False,
 ):
+    """Классический подбор: кандидат должен пройти все фильтры профиля.
+
+    Таблицы (и пачки из iter_candidates) фильтруются векторно в порядке,
+    выбранном планировщиком по статистике таблицы: сначала самые
+    селективные условия. При explain=True для таблиц печатается план с
+    оценкой и фактическим числом строк после каждого фильтра, при флаге
+    why — воронка отсева по критериям (см. elimination_funnel).
+    """
+    # В режиме --why все условия проверяются на всех кандидатах, чтобы
+    # за тот же проход посчитать воронку отсева
+    if flags.get("why"):
+        results, funnel = diagnose(candidates, profile, flags)
+        print(funnel.format())
+        return results
+
+    # Для SQLite хранилища фильтры выполняются в самой базе, для индекса —
+    # через списки значений и двоичный поиск (с explain индекс проходится
+    # как таблица и добавленные кандидаты, чтобы показать план)
+    if isinstance(candidates, SqliteCandidateStore) or (isinstance(candidates, CandidateIndex) and not explain):
+        return candidates.query(profile, flags)
+    if isinstance(candidates, CandidateTable):
+        candidates = [candidates]
+
+    lang_groups = pref_groups(LANGUAGE_VOCAB, profile["languages"], flags["relaxed"])
+    fmt_groups = pref_groups(FORMAT_VOCAB, profile["formats"], flags["relaxed"])
     results = []
-    for c in candidates:
-        if not check_pref(
-            c.language, profile["languages"], flags["relaxed"], flags["all"]
-        ):
-            continue
-        if profile["level"] and profile["level"] != c.level.lower():
-            continue
-        if not (profile["years_range"][0] <= c.years <= profile["years_range"][1]):
-            continue
-        if not check_pref(c.format, profile["formats"], flags["relaxed"], flags["all"]):
-            continue
-        if not (profile["salary_range"][0] <= c.salary <= profile["salary_range"][1]):
-            continue
-        results.append(c)
+    plans: List[QueryPlan] = []
+    for item in candidates:
+        if isinstance(item, CandidateTable):
+            plan = plan_query(item.stats, profile, flags)
+            results.extend(item[int(i)] for i in execute_plan(item, plan, profile, flags))
+            plans.append(plan)
+        elif _classic_match(item, profile, flags, lang_groups, fmt_groups):
+            results.append(item)
+
+    if explain and plans:
+        print(merge_plans(plans).format())
     return results
 
 
@@ -116,15 +224,115 @@ def classic_recommend(
 # ---------------------------------------------------------------------------
 
 
+# Кэш результатов recommend (сбрасывается при изменении базы знаний)
+RESULT_CACHE = ResultCache()
+
+
 def recommend(
-    candidates: List[Candidate], profile: Dict[str, Any], flags: Dict[str, bool]
+    candidates: List[Candidate], profile: Dict[str, Any], flags: Dict[str, bool],
+    top_k: Optional[int] = None, use_cache: bool = True,
 ):
     """Выбор режима подбора — классический или Баесовский.
     
-    Для байесовского режима возвращает список кортежей (Candidate, вероятность).
+    Для байесовского режима возвращает список кортежей (Candidate, вероятность),
+    ограниченный top_k лучшими, если он задан.
     Для классического режима возвращает список Candidate.
+    Повторные запросы с тем же профилем к тому же источнику берутся из
+    RESULT_CACHE; одноразовые потоки пачек не кэшируются.
     """
+    cacheable = (use_cache and not flags.get("explain") and not flags.get("why")
+                 and not isinstance(candidates, Iterator))
+    if cacheable:
+        key = profile_key(profile, flags, top_k)
+        cached = RESULT_CACHE.get(candidates, key)
+        if cached is not None:
+            return list(cached)
+
     if flags.get("bayes"):
-        return bayesian_recommend(candidates, profile, threshold=0.3)
+        results = bayesian_recommend(candidates, profile, threshold=0.3, top_k=top_k)
     else:
-        return classic_recommend(candidates, profile, flags)
+        results = classic_recommend(candidates, profile, flags, explain=flags.get("explain", False))
+
+    if cacheable:
+        RESULT_CACHE.put(candidates, key, list(results))
+    return results
+
+
+def _table_batches(candidates: Iterable) -> Iterator[CandidateTable]:
+    """Пачки кандидатов в виде таблиц; объекты Candidate собираются в таблицы."""
+    if isinstance(candidates, CandidateTable):
+        candidates = [candidates]
+    chunk: List[Candidate] = []
+    for item in candidates:
+        if isinstance(item, CandidateTable):
+            yield item
+            continue
+        chunk.append(item)
+        if len(chunk) >= CHUNK_SIZE:
+            yield CandidateTable.from_candidates(chunk)
+            chunk = []
+    if chunk:
+        yield CandidateTable.from_candidates(chunk)
+
+
+def recommend_many(
+    profiles: Iterable[Dict[str, Any]], candidates: Iterable, flags: Dict[str, bool],
+    top_k: Optional[int] = None, memory_budget: int = MATCH_MEMORY_BUDGET,
+) -> List[list]:
+    """Подбор для многих профилей за один проход по базе кандидатов.
+
+    Возвращает по списку на каждый профиль в том же формате, что и recommend:
+    для байесовского режима — top_k лучших (Candidate, вероятность), для
+    классического — первые top_k подходящих кандидатов в порядке базы
+    (все, если top_k не задан). Матрицы "профили x кандидаты" считаются
+    блоками, которые укладываются в memory_budget байт.
+    """
+    profiles = list(profiles)
+    if isinstance(candidates, CandidateIndex):
+        # Индекс отвечает на каждый профиль без полного прохода
+        return [recommend(candidates, p, flags, top_k=top_k, use_cache=False) for p in profiles]
+
+    pm = ProfileMatrix.encode(profiles, flags.get("relaxed", False))
+    if flags.get("bayes"):
+        rankings = [_BayesRanking(0.3, top_k) for _ in profiles]
+        running = np.full(len(profiles), -np.inf)
+        log_threshold = rankings[0].log_threshold if rankings else 0.0
+        for table in _table_batches(candidates):
+            codes = table.codes
+            picked_rows: List[List[np.ndarray]] = [[] for _ in profiles]
+            picked_scores: List[List[np.ndarray]] = [[] for _ in profiles]
+            for rows, cols in blocks(len(table), len(profiles), memory_budget):
+                scores = bayes_matrix(table, codes, rows, pm, cols)
+                # Отбор сразу по всем столбцам: строки ниже порога относительно
+                # текущего максимума и вне top_k блока в накопитель не попадут
+                running[cols] = np.maximum(running[cols], scores.max(axis=1))
+                keep = scores - running[cols, None] >= log_threshold
+                if top_k is not None and 0 < top_k < scores.shape[1]:
+                    keep &= scores >= -np.partition(-scores, top_k - 1, axis=1)[:, top_k - 1:top_k]
+                for j in range(cols.start, cols.stop):
+                    row_scores = scores[j - cols.start]
+                    picked = np.flatnonzero(keep[j - cols.start])
+                    if top_k is not None and len(picked) > top_k:
+                        picked = picked[_top_k_indices(row_scores[picked], top_k)]
+                    picked_rows[j].append(rows.start + picked)
+                    picked_scores[j].append(row_scores[picked])
+            # Кандидаты создаются один раз на таблицу, а не на каждый блок строк
+            for j, ranking in enumerate(rankings):
+                if picked_rows[j]:
+                    ranking.add(table, np.concatenate(picked_scores[j]), np.concatenate(picked_rows[j]))
+        return [ranking.result() for ranking in rankings]
+
+    results: List[List[Candidate]] = [[] for _ in profiles]
+    for table in _table_batches(candidates):
+        codes = table.codes
+        for rows, cols in blocks(len(table), len(profiles), memory_budget):
+            ok = classic_matrix(table, codes, rows, pm, cols, flags["all"])
+            # Пары (профиль, строка) упорядочены по профилю, затем по строке
+            profile_ids, row_ids = np.nonzero(ok)
+            bounds = np.searchsorted(profile_ids, np.arange(ok.shape[0] + 1))
+            for j in range(ok.shape[0]):
+                found = results[cols.start + j]
+                room = len(row_ids) if top_k is None else top_k - len(found)
+                picked = row_ids[bounds[j]:bounds[j + 1]][:max(room, 0)]
+                found.extend(table[rows.start + int(i)] for i in picked)
+    return results
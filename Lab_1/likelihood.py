@@ -0,0 +1,154 @@
+# likelihood.py
+"""Таблицы правдоподобия байесовского режима.
+
+Множители правдоподобия заданы по атрибутам в LIKELIHOODS. Для профиля
+они вычисляются один раз на каждое различное значение атрибута таблицы
+кандидатов (маску языков и форматов, уровень, стаж, зарплату) и хранятся
+логарифмами. Оценка кандидата — сумма выборок из этих таблиц, поэтому
+стоимость расчёта множителей зависит от числа различных значений, а не
+от числа кандидатов, а сумма логарифмов не уходит в ноль при росте числа
+множителей.
+"""
+import math
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from candidate_manager import Candidate, CandidateTable, LANGUAGE_VOCAB, FORMAT_VOCAB
+
+# Множители по атрибутам: совпадение, близость к диапазону, промах
+LIKELIHOODS = {
+    "languages": {"match": 0.9, "miss": 0.5},
+    "level": {"match": 0.8, "miss": 0.6},
+    "years": {"match": 0.9, "near": 0.7, "miss": 0.5},
+    "formats": {"match": 0.8, "miss": 0.6},
+    "salary": {"match": 0.9, "near": 0.7, "miss": 0.4},
+}
+LOG_LIKELIHOODS = {
+    attr: {kind: math.log(value) for kind, value in factors.items()}
+    for attr, factors in LIKELIHOODS.items()
+}
+
+# Порядок суммирования множителей
+FACTORS = ("languages", "level", "years", "formats", "salary")
+
+# "Рядом с диапазоном": стаж — не дальше NEAR_YEARS лет от границы,
+# зарплата — отклонение меньше NEAR_SALARY от верхней границы
+NEAR_YEARS = 2
+NEAR_SALARY = 0.2
+
+
+def _select(cond, a, b):
+    """np.where для массивов, условное выражение для значений одного кандидата."""
+    if isinstance(cond, np.ndarray):
+        return np.where(cond, a, b)
+    return a if cond else b
+
+
+def log_likelihood(attr: str, match, near=None):
+    """Логарифмы множителей атрибута по признакам совпадения и близости."""
+    logs = LOG_LIKELIHOODS[attr]
+    miss = logs["miss"] if near is None else _select(near, logs["near"], logs["miss"])
+    return _select(match, logs["match"], miss)
+
+
+def in_range(values, low, high):
+    return (low <= values) & (values <= high)
+
+
+def years_near(years, low, high):
+    return (abs(years - low) <= NEAR_YEARS) | (abs(years - high) <= NEAR_YEARS)
+
+
+def salary_near(salary, low, high):
+    # Без верхней границы "рядом" только зарплаты не ниже нижней границы
+    diff = abs(_select(salary < low, salary - low, salary - high))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bounded = np.divide(diff, high) < NEAR_SALARY
+    return _select(np.isinf(high), salary >= low, bounded)
+
+
+def mask_match(masks, mask: int):
+    """Проверка пересечения масок значений (массива или одной маски) с маской профиля."""
+    if isinstance(masks, int) or masks.dtype == object:
+        return (masks & mask) != 0
+    # В uint64-маски попадают только первые 64 значения словаря
+    return (masks & np.uint64(mask & 0xFFFFFFFFFFFFFFFF)) != 0
+
+
+def attr_logs(attr: str, values, profile: Dict[str, Any]):
+    """Логарифмы множителя attr для значений атрибута; None — атрибут не задан.
+
+    values — различные значения столбца таблицы (массив масок, стажа или
+    зарплат, список уровней) или значение одного кандидата; в обоих случаях
+    множители считаются одними и теми же правилами.
+    """
+    if attr in ("languages", "formats"):
+        if not profile[attr]:
+            return None
+        vocab = LANGUAGE_VOCAB if attr == "languages" else FORMAT_VOCAB
+        return log_likelihood(attr, mask_match(values, vocab.folded_mask(profile[attr])))
+    if attr == "level":
+        if not profile["level"]:
+            return None
+        target = profile["level"].lower()
+        if isinstance(values, str):
+            return log_likelihood(attr, values.lower() == target)
+        return log_likelihood(attr, np.array([v.lower() == target for v in values], dtype=bool))
+    low, high = profile[f"{attr}_range"]
+    near = years_near if attr == "years" else salary_near
+    return log_likelihood(attr, in_range(values, low, high), near(values, low, high))
+
+
+def factor_table(table: CandidateTable, attr: str,
+                 profile: Dict[str, Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Логарифмы множителя attr по различным значениям таблицы и номера значений по строкам.
+
+    None — атрибут в профиле не задан (множитель равен 1).
+    """
+    codes = table.codes
+    values, inverse = {
+        "languages": (codes.language_values, codes.language_inverse),
+        "level": (table.level_vocab, table.level_codes),
+        "years": (codes.years_values, codes.years_inverse),
+        "formats": (codes.format_values, codes.format_inverse),
+        "salary": (codes.salary_values, codes.salary_inverse),
+    }[attr]
+    logs = attr_logs(attr, values, profile)
+    if logs is None:
+        return None
+    return logs, inverse
+
+
+def factor_column(table: CandidateTable, attr: str, profile: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Логарифм множителя attr по строкам таблицы (None — атрибут не задан)."""
+    factors = factor_table(table, attr, profile)
+    if factors is None:
+        return None
+    logs, inverse = factors
+    return np.take(logs, inverse)
+
+
+def log_scores(table: CandidateTable, profile: Dict[str, Any]) -> np.ndarray:
+    """Логарифмы байесовских оценок всех строк таблицы."""
+    total = np.zeros(len(table))
+    for attr in FACTORS:
+        column = factor_column(table, attr, profile)
+        if column is not None:
+            total += column
+    return total
+
+
+def candidate_log_score(c: Candidate, profile: Dict[str, Any]) -> float:
+    """Логарифм байесовской оценки одного кандидата без построения таблицы.
+
+    Множители те же, что у log_scores, и складываются в том же порядке.
+    """
+    values = {"languages": c.language_mask, "level": c.level, "years": c.years,
+              "formats": c.format_mask, "salary": c.salary}
+    total = 0.0
+    for attr in FACTORS:
+        logs = attr_logs(attr, values[attr], profile)
+        if logs is not None:
+            total += logs
+    return float(total)
@@ -1,8 +1,55 @@
 # main.py
 import sys
-from config import FLAGS, LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS
-from candidate_manager import load_candidates, save_candidate, Candidate
+from config import FLAGS, LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS, RECOMMEND_WORKERS
+from candidate_manager import Candidate, store_version
+from candidate_store import SqliteCandidateStore, open_store
+from candidate_index import CandidateIndex
 from expert_system import recommend
+from bayes_session import BayesSession
+from parallel import ParallelRecommender
+
+# Хранилище (config.STORAGE_BACKEND) и индекс загруженной базы знаний:
+# добавленные кандидаты попадают в индекс через подписку на запись, поэтому
+# база загружается один раз (результаты кэшируются до следующей записи)
+_loaded = {"store": None, "candidates": None, "pool": None, "pool_version": None}
+
+
+def get_store():
+    if _loaded["store"] is None:
+        _loaded["store"] = open_store()
+    return _loaded["store"]
+
+
+def get_candidates():
+    store = get_store()
+    if isinstance(store, SqliteCandidateStore):
+        # Фильтры классического подбора выполняются в самой базе
+        return store
+    if _loaded["candidates"] is None:
+        index = CandidateIndex(store.load())
+        index.attach()
+        _loaded["candidates"] = index
+    return _loaded["candidates"]
+
+
+def get_pool(workers: int) -> ParallelRecommender:
+    """Пул параллельного подбора (--workers); после записи в базу строится заново."""
+    if _loaded["pool"] is None or _loaded["pool_version"] != store_version():
+        close_pool()
+        _loaded["pool"] = ParallelRecommender(get_store().load(), workers)
+        _loaded["pool_version"] = store_version()
+    return _loaded["pool"]
+
+
+def close_pool():
+    if _loaded["pool"] is not None:
+        _loaded["pool"].close()
+        _loaded["pool"] = None
+
+
+# Байесовская сессия: при уточнении профиля пересчитываются только
+# изменившиеся критерии
+_bayes_session = BayesSession()
 
 
 def print_menu():
@@ -50,13 +97,13 @@ def add_candidate_flow():
     candidate = Candidate(
         name=name, language=langs, level=level, years=years, format=fmts, salary=salary
     )
-    save_candidate(candidate)
+    get_store().add(candidate)
 
 
 def run_expert_system_flow(flags):
     """Запуск экспертной системы с поддержкой Баесовского режима."""
     print("\n--- Запуск экспертной системы ---")
-    candidates = load_candidates()
+    candidates = get_candidates()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -77,6 +124,9 @@ def run_expert_system_flow(flags):
             int(x.strip()) - 1 for x in lang_input.split(",") if x.strip().isdigit()
         ]
         selected_langs = [LANGUAGES[i] for i in indices if 0 <= i < len(LANGUAGES)]
+        if flags["relaxed"]:
+            # В мягком режиме можно ввести и сами значения: "Type", "JS", "Pyton"
+            selected_langs += [x.strip() for x in lang_input.split(",") if x.strip() and not x.strip().isdigit()]
     
     # Уровень опыта
     print("\nВыберите требуемый уровень опыта:")
@@ -120,6 +170,9 @@ def run_expert_system_flow(flags):
             int(x.strip()) - 1 for x in fmt_input.split(",") if x.strip().isdigit()
         ]
         selected_fmts = [WORK_FORMATS[i] for i in indices if 0 <= i < len(WORK_FORMATS)]
+        if flags["relaxed"]:
+            # В мягком режиме можно ввести и сами значения: "Type", "JS", "Pyton"
+            selected_fmts += [x.strip() for x in fmt_input.split(",") if x.strip() and not x.strip().isdigit()]
     
     # Зарплата
     print("\nВведите минимальную и максимальную ожидаемую зарплату (например, 30000 50000).")
@@ -148,7 +201,15 @@ def run_expert_system_flow(flags):
         "salary_range": (min_salary, max_salary),
     }
     
-    results = recommend(candidates, profile, flags)
+    # Диагностика (--why) и план (--explain) выводятся только в основном процессе
+    if flags["workers"] and not (flags["why"] or flags["explain"]):
+        results = get_pool(flags["workers"]).recommend(profile, flags)
+    elif flags.get("bayes"):
+        results = _bayes_session.recommend(candidates, profile)
+        if len(_bayes_session.recomputed) < len(_bayes_session.columns):
+            print(f"\nПересчитаны критерии: {', '.join(_bayes_session.recomputed) or 'нет'}")
+    else:
+        results = recommend(candidates, profile, flags)
 
     # Байесовский режим - вывод здесь в main.py
     if flags.get("bayes"):
@@ -179,6 +240,18 @@ def run_expert_system_flow(flags):
               f"Зарплата: {c.salary} руб.")
 
 
+def parse_workers(argv) -> int:
+    """Число процессов из "--workers N" (без ключа — config.RECOMMEND_WORKERS)."""
+    flag = FLAGS.get("workers", "--workers")
+    if flag not in argv:
+        return RECOMMEND_WORKERS
+    i = argv.index(flag)
+    if i + 1 < len(argv) and argv[i + 1].isdigit():
+        return int(argv[i + 1])
+    print(f"После {flag} нужно указать число процессов; подбор без пула.")
+    return 0
+
+
 def main():
     # Разбор флагов командной строки
     flags = {
@@ -186,6 +259,8 @@ def main():
         "all": FLAGS["all"] in sys.argv,
         "why": FLAGS["why"] in sys.argv,
         "bayes": FLAGS.get("bayes", "--bayes") in sys.argv,
+        "explain": FLAGS.get("explain", "--explain") in sys.argv,
+        "workers": parse_workers(sys.argv),
     }
 
     print("=" * 70)
@@ -209,7 +284,8 @@ def main():
     if flags["relaxed"]:
         print("\n🔹 --relaxed: МЯГКИЙ РЕЖИМ")
         print("   Поиск по подстроке для языков и форматов работы.")
-        print("   Например, если выбран Python, подойдут кандидаты со знанием Python.")
+        print("   Например, Java подойдёт и для JavaScript, а при вводе текста")
+        print("   распознаются аббревиатуры и опечатки: JS, Type, Pyton.")
         print("   Хотя бы одно совпадение из списка считается успешным.")
     
     if flags["all"]:
@@ -223,24 +299,38 @@ def main():
         print("   Показывает причины, по которым кандидаты были отсеяны.")
         print("   Полезно для понимания, почему не найдено подходящих кандидатов.")
         print("   Помогает скорректировать критерии поиска.")
+
+    if flags["explain"]:
+        print("\n🔹 --explain: ПЛАН ФИЛЬТРАЦИИ")
+        print("   Показывает порядок фильтров, выбранный по статистике базы,")
+        print("   и оценку числа кандидатов после каждого фильтра в сравнении с фактом.")
+
+    if flags["workers"]:
+        print(f"\n🔹 --workers {flags['workers']}: ПАРАЛЛЕЛЬНЫЙ ПОДБОР")
+        print("   База делится на шарды, которые оцениваются пулом процессов.")
+        print("   С --why и --explain подбор выполняется в основном процессе.")
     
-    if not any([flags["bayes"], flags["relaxed"], flags["all"], flags["why"]]):
+    if not any([flags["bayes"], flags["relaxed"], flags["all"], flags["why"], flags["explain"],
+                flags["workers"]]):
         print("   Нет активных флагов. Используется стандартный режим.")
-        print("   Доступные флаги: --bayes, --relaxed, --all, --why")
+        print("   Доступные флаги: --bayes, --relaxed, --all, --why, --explain, --workers N")
     
     print("\n" + "=" * 70)
 
-    while True:
-        choice = print_menu()
-        if choice == "1":
-            add_candidate_flow()
-        elif choice == "2":
-            run_expert_system_flow(flags)
-        elif choice == "3":
-            print("До свидания!")
-            break
-        else:
-            print("Некорректный выбор. Пожалуйста, введите 1, 2 или 3.")
+    try:
+        while True:
+            choice = print_menu()
+            if choice == "1":
+                add_candidate_flow()
+            elif choice == "2":
+                run_expert_system_flow(flags)
+            elif choice == "3":
+                print("До свидания!")
+                break
+            else:
+                print("Некорректный выбор. Пожалуйста, введите 1, 2 или 3.")
+    finally:
+        close_pool()
 
 
 if __name__ == "__main__":
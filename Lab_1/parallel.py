@@ -0,0 +1,155 @@
+# parallel.py
+"""Параллельный подбор по шардам базы кандидатов.
+
+Колонки таблицы (имена буфером UTF-8, коды уровня, стаж, зарплата, коды
+языков и форматов со смещениями) один раз копируются в
+multiprocessing.shared_memory. Процессы
+постоянного пула подключаются к этому блоку при запуске и строят поверх
+него таблицу без копирования; задачей передаются только границы шарда
+и профиль. Шард возвращает номера строк (и логарифмы оценок), а не объекты
+Candidate: кандидаты создаются в основном процессе только для результата.
+Частичные top-k списки шардов сливаются в порядке шардов, поэтому
+результат совпадает с последовательным recommend. Точки входа включают
+пул ключом --workers N (по умолчанию config.RECOMMEND_WORKERS).
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import PARALLEL_WORKERS, SHARDS_PER_WORKER
+from candidate_manager import Candidate, CandidateTable
+from snapshot import PackedStrings
+from expert_system import _BayesRanking, _top_k_indices
+from likelihood import log_scores
+from query_planner import execute_plan, plan_query
+
+# Колонки таблицы, которые помещаются в разделяемую память (имена — отдельно,
+# буфером и смещениями PackedStrings)
+SHARED_COLUMNS = ("level_codes", "years", "salary", "language_codes", "language_offsets",
+                  "format_codes", "format_offsets")
+NAME_COLUMNS = ("names_data", "names_offsets")
+ALIGN = 64
+
+# Состояние процесса пула: разделяемый блок, таблица поверх него и шарды
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(shm_name: str, layout: Dict[str, Tuple[int, str, int]],
+                 vocabs: Dict[str, List[str]]):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    columns = {
+        name: np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        for name, (offset, dtype, length) in layout.items()
+    }
+    names = PackedStrings(*(columns.pop(name) for name in NAME_COLUMNS))
+    _worker["shm"] = shm
+    _worker["table"] = CandidateTable(names=names, **columns, **vocabs)
+    _worker["shards"] = {}
+
+
+def _shard(start: int, stop: int) -> CandidateTable:
+    # Таблица шарда кэшируется: маски и статистика считаются один раз
+    key = (start, stop)
+    table = _worker["shards"].get(key)
+    if table is None:
+        table = _worker["shards"][key] = _worker["table"].shard(start, stop)
+    return table
+
+
+def _classic_task(args) -> np.ndarray:
+    start, stop, profile, flags = args
+    table = _shard(start, stop)
+    plan = plan_query(table.stats, profile, flags)
+    return start + execute_plan(table, plan, profile, flags)
+
+
+def _bayes_task(args) -> Tuple[np.ndarray, np.ndarray]:
+    start, stop, profile, threshold, top_k = args
+    scores = log_scores(_shard(start, stop), profile)
+    if not len(scores):
+        return np.empty(0, dtype=np.intp), scores
+    # Порог относительно максимума шарда пропускает всех, кто может пройти
+    # порог относительно общего максимума (он не меньше)
+    rows = np.flatnonzero(scores - scores.max() >= _BayesRanking(threshold, top_k).log_threshold)
+    if top_k is not None:
+        rows = rows[_top_k_indices(scores[rows], top_k)]
+    return start + rows, scores[rows]
+
+
+class ParallelRecommender:
+    """Подбор по таблице кандидатов пулом процессов над разделяемой памятью."""
+
+    def __init__(self, table: CandidateTable, workers: Optional[int] = PARALLEL_WORKERS,
+                 shards_per_worker: int = SHARDS_PER_WORKER):
+        self.table = table
+        self.workers = workers or os.cpu_count() or 1
+        n = len(table)
+        count = max(1, min(n, self.workers * shards_per_worker))
+        bounds = np.linspace(0, n, count + 1).astype(int)
+        self.shards = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+        names = table.names
+        if not isinstance(names, PackedStrings):
+            names = PackedStrings.pack(names)
+        arrays = {name: np.asarray(getattr(table, name)) for name in SHARED_COLUMNS}
+        arrays["names_data"], arrays["names_offsets"] = names.data, names.offsets
+
+        layout: Dict[str, Tuple[int, str, int]] = {}
+        size = 0
+        for name, arr in arrays.items():
+            size += -size % ALIGN
+            layout[name] = (size, arr.dtype.str, len(arr))
+            size += arr.nbytes
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, (offset, dtype, length) in layout.items():
+            target = np.ndarray((length,), dtype=np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+            target[:] = arrays[name]
+            del target
+
+        vocabs = {"level_vocab": list(table.level_vocab),
+                  "language_vocab": list(table.language_vocab),
+                  "format_vocab": list(table.format_vocab)}
+        self._pool = mp.get_context().Pool(
+            self.workers, initializer=_init_worker,
+            initargs=(self._shm.name, layout, vocabs),
+        )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "ParallelRecommender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def classic_recommend(self, profile: Dict[str, Any], flags: Dict[str, bool]) -> List[Candidate]:
+        tasks = [(start, stop, profile, flags) for start, stop in self.shards]
+        parts = self._pool.map(_classic_task, tasks)
+        return [self.table[int(i)] for part in parts for i in part]
+
+    def bayesian_recommend(self, profile: Dict[str, Any], threshold: float = 0.3,
+                           top_k: Optional[int] = None) -> List[Tuple[Candidate, float]]:
+        tasks = [(start, stop, profile, threshold, top_k) for start, stop in self.shards]
+        ranking = _BayesRanking(threshold, top_k)
+        # Частичные списки сливаются в порядке шардов (как при одном проходе)
+        for rows, scores in self._pool.map(_bayes_task, tasks):
+            ranking.add(self.table, scores, rows)
+        return ranking.result()
+
+    def recommend(self, profile: Dict[str, Any], flags: Dict[str, bool],
+                  top_k: Optional[int] = None):
+        """Аналог expert_system.recommend, выполняемый по шардам в пуле."""
+        if flags.get("bayes"):
+            return self.bayesian_recommend(profile, threshold=0.3, top_k=top_k)
+        return self.classic_recommend(profile, flags)
@@ -0,0 +1,180 @@
+# query_planner.py
+"""Планировщик фильтров классического подбора.
+
+По статистике таблицы (CandidateStats) оценивается, сколько строк пройдёт
+каждое условие профиля, и условия выполняются от самого селективного к
+наименее селективному. Каждое следующее условие проверяется только на
+строках, прошедших предыдущие, а при пустом остатке проверка прекращается.
+Условия, которым заведомо удовлетворяют все строки (например, диапазон
+стажа шире фактического), в план не попадают.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from candidate_manager import CandidateTable, LANGUAGE_VOCAB, FORMAT_VOCAB
+from candidate_stats import CandidateStats
+from vocab_search import pref_groups
+
+# Порядок условий по умолчанию (как в скалярной проверке classic_recommend)
+CRITERIA = ("languages", "level", "years", "formats", "salary")
+
+
+@dataclass
+class PlanStep:
+    criterion: str
+    selectivity: float  # оценка доли строк, проходящих условие
+    estimated: float    # оценка числа строк после шага
+    actual: int = 0     # фактическое число строк после шага
+
+
+@dataclass
+class QueryPlan:
+    rows: int
+    steps: List[PlanStep]
+
+    @property
+    def order(self) -> List[str]:
+        return [step.criterion for step in self.steps]
+
+    def format(self) -> str:
+        """Текстовый отчёт: порядок фильтров, оценка и факт по строкам."""
+        lines = [f"План фильтрации (строк в базе: {self.rows}):"]
+        if not self.steps:
+            lines.append("  фильтры не требуются — подходят все строки")
+        for i, step in enumerate(self.steps, 1):
+            lines.append(
+                f"  {i}. {step.criterion:<9} селективность {step.selectivity:.3f} | "
+                f"оценка: {step.estimated:.0f} | факт: {step.actual}"
+            )
+        return "\n".join(lines)
+
+
+def active_criteria(profile: Dict[str, Any]) -> List[str]:
+    """Условия профиля, которые нужно проверять (диапазоны — всегда)."""
+    return [c for c in CRITERIA if c not in ("languages", "level", "formats") or profile[c]]
+
+
+def plan_query(stats: CandidateStats, profile: Dict[str, Any], flags: Dict[str, bool]) -> QueryPlan:
+    """Выбирает порядок условий по возрастанию оценки селективности."""
+    n = stats.rows
+    selectivities = []
+    for criterion in CRITERIA:
+        estimate = _estimate_rows(stats, criterion, profile, flags)
+        if estimate is not None:
+            selectivities.append((criterion, estimate / n if n else 0.0))
+
+    steps: List[PlanStep] = []
+    remaining = float(n)
+    for criterion, selectivity in sorted(selectivities, key=lambda s: s[1]):
+        # Оценка остатка в предположении независимости атрибутов
+        remaining *= selectivity
+        steps.append(PlanStep(criterion, selectivity, remaining))
+    return QueryPlan(n, steps)
+
+
+def execute_plan(table: CandidateTable, plan: QueryPlan, profile: Dict[str, Any],
+                 flags: Dict[str, bool]) -> np.ndarray:
+    """Номера строк, прошедших все условия плана, по возрастанию."""
+    rows = np.arange(len(table))
+    for step in plan.steps:
+        if len(rows):
+            rows = rows[criterion_match(table, step.criterion, rows, profile, flags)]
+        step.actual = len(rows)
+    return rows
+
+
+def merge_plans(plans: List[QueryPlan]) -> QueryPlan:
+    """Суммирует планы по пачкам базы в один отчёт (порядок — первой пачки)."""
+    if not plans:
+        return QueryPlan(0, [])
+    totals: Dict[str, PlanStep] = {}
+    for plan in plans:
+        for step in plan.steps:
+            total = totals.setdefault(step.criterion, PlanStep(step.criterion, 0.0, 0.0))
+            total.estimated += step.estimated
+            total.actual += step.actual
+    rows = sum(plan.rows for plan in plans)
+    order = plans[0].order + [c for c in totals if c not in plans[0].order]
+    steps = [totals[c] for c in order]
+    for step in steps:
+        step.selectivity = sum(
+            s.selectivity * p.rows for p in plans for s in p.steps if s.criterion == step.criterion
+        ) / rows if rows else 0.0
+    return QueryPlan(rows, steps)
+
+
+def _estimate_rows(stats: CandidateStats, criterion: str, profile: Dict[str, Any],
+                   flags: Dict[str, bool]):
+    """Оценка числа строк, проходящих условие; None — условие не нужно."""
+    n = stats.rows
+    if criterion in ("languages", "formats"):
+        if not profile[criterion]:
+            return None
+        if criterion == "languages":
+            counts, vocab = stats.language_counts, LANGUAGE_VOCAB
+        else:
+            counts, vocab = stats.format_counts, FORMAT_VOCAB
+        groups = set(pref_groups(vocab, profile[criterion], flags["relaxed"]))
+        shares = [
+            min(sum(counts.get(value, 0) for value in vocab.decode(group)) / n, 1.0) if n else 0.0
+            for group in groups
+        ]
+        if flags["all"]:
+            return n * float(np.prod(shares))
+        return n * (1.0 - float(np.prod([1.0 - s for s in shares])))
+
+    if criterion == "level":
+        if not profile["level"]:
+            return None
+        return float(stats.level_counts.get(profile["level"], 0))
+
+    histogram = stats.years if criterion == "years" else stats.salary
+    low, high = profile[f"{criterion}_range"]
+    if n and histogram.covers(low, high):
+        return None
+    return histogram.estimate(low, high)
+
+
+def criterion_match(table: CandidateTable, criterion: str, rows: np.ndarray,
+                     profile: Dict[str, Any], flags: Dict[str, bool]) -> np.ndarray:
+    """Векторная проверка одного условия на подмножестве строк."""
+    if criterion == "languages":
+        groups = pref_groups(LANGUAGE_VOCAB, profile["languages"], flags["relaxed"])
+        return _pref_match(table.language_masks[rows], groups, flags["all"])
+    if criterion == "formats":
+        groups = pref_groups(FORMAT_VOCAB, profile["formats"], flags["relaxed"])
+        return _pref_match(table.format_masks[rows], groups, flags["all"])
+    if criterion == "level":
+        level_match = np.array([v.lower() == profile["level"] for v in table.level_vocab], dtype=bool)
+        return level_match[table.level_codes[rows]]
+    values = (table.years if criterion == "years" else table.salary)[rows]
+    low, high = profile[f"{criterion}_range"]
+    return (low <= values) & (values <= high)
+
+
+def _pref_match(masks: np.ndarray, groups: List[int], require_all: bool) -> np.ndarray:
+    """Семантика check_pref над массивом масок: any или all по группам."""
+    combined = 0
+    for group in groups:
+        combined |= group
+    # В строгом режиме каждая группа — один бит, и all сводится к одной маске
+    if not require_all or all(group and not group & (group - 1) for group in groups):
+        return _mask_test(masks, combined, require_all)
+    result = np.ones(len(masks), dtype=bool)
+    for group in set(groups):
+        result &= _mask_test(masks, group, False)
+    return result
+
+
+def _mask_test(masks: np.ndarray, pref_mask: int, require_all: bool) -> np.ndarray:
+    if masks.dtype == object:
+        common = masks & pref_mask
+        return common == pref_mask if require_all else common != 0
+    # В uint64-масках нет значений с номером словаря 64 и выше
+    if require_all and pref_mask >> 64:
+        return np.zeros(len(masks), dtype=bool)
+    low_mask = np.uint64(pref_mask & 0xFFFFFFFFFFFFFFFF)
+    common = masks & low_mask
+    return common == low_mask if require_all else common != 0
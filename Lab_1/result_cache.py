@@ -0,0 +1,110 @@
+# result_cache.py
+"""LRU-кэш результатов подбора.
+
+Ключ — источник кандидатов, каноническая форма профиля и флаги режима.
+Все записи сбрасываются, как только меняется версия базы знаний
+(store_version растёт при каждой записи через save_candidate). Источник
+хранится по слабой ссылке: кэш не удерживает в памяти таблицы и индексы,
+которые заменены (например, при перезагрузке базы сервером), а их записи
+удаляются при следующем обращении к кэшу.
+"""
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from config import RESULT_CACHE_SIZE
+from candidate_manager import store_version
+
+# Флаги, от которых зависит результат подбора
+MODE_FLAGS = ("relaxed", "all", "bayes")
+
+
+def profile_key(profile: Dict[str, Any], flags: Dict[str, bool], top_k: Optional[int] = None) -> Tuple:
+    """Каноническая форма профиля: порядок и повторы в списках не важны."""
+    return (
+        tuple(sorted(set(profile["languages"]))),
+        profile["level"],
+        tuple(profile["years_range"]),
+        tuple(sorted(set(profile["formats"]))),
+        tuple(profile["salary_range"]),
+        tuple(bool(flags.get(name)) for name in MODE_FLAGS),
+        top_k,
+    )
+
+
+class ResultCache:
+    """Кэш с ограничением размера, вытеснением LRU и счётчиками попаданий."""
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Callable[[], Any], Any]]" = OrderedDict()
+        self._version = store_version()
+        # Финализаторы источников по id и id источников, удалённых сборщиком
+        self._finalizers: Dict[int, weakref.finalize] = {}
+        self._dead: List[int] = []
+
+    def __len__(self) -> int:
+        self._drop_dead()
+        return len(self._entries)
+
+    def get(self, source: Any, key: Hashable) -> Optional[Any]:
+        self._check_version()
+        entry = self._entries.get((id(source), key))
+        # Ссылка на источник хранится в записи, чтобы его id не мог достаться другому объекту
+        if entry is None or entry[0]() is not source:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((id(source), key))
+        self.hits += 1
+        return entry[1]
+
+    def put(self, source: Any, key: Hashable, value: Any):
+        self._check_version()
+        if self.maxsize <= 0:
+            return
+        self._entries[(id(source), key)] = (self._ref(source), value)
+        self._entries.move_to_end((id(source), key))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+    def _ref(self, source: Any) -> Callable[[], Any]:
+        """Слабая ссылка на источник; при его удалении записи помечаются к сбросу."""
+        try:
+            ref = weakref.ref(source)
+        except TypeError:
+            # Списки и кортежи кандидатов слабых ссылок не допускают
+            return lambda: source
+        if id(source) not in self._finalizers:
+            finalizer = weakref.finalize(source, self._dead.append, id(source))
+            finalizer.atexit = False
+            self._finalizers[id(source)] = finalizer
+        return ref
+
+    def _drop_dead(self):
+        """Удаляет записи источников, собранных сборщиком мусора."""
+        # Финализатор только запоминает id: словарь не меняется во время сборки мусора
+        if not self._dead:
+            return
+        dead = set()
+        while self._dead:
+            dead.add(self._dead.pop())
+        for source_id in dead:
+            self._finalizers.pop(source_id, None)
+        for entry_key in [k for k in self._entries if k[0] in dead]:
+            del self._entries[entry_key]
+
+    def _check_version(self):
+        self._drop_dead()
+        version = store_version()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
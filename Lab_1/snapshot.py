@@ -0,0 +1,169 @@
+# snapshot.py
+"""Бинарный колоночный снимок базы кандидатов рядом с CSV файлом.
+
+Формат файла: сигнатура, длина JSON-заголовка, сам заголовок и блоки
+массивов, выровненные по 64 байта. При загрузке файл отображается в
+память (np.memmap), поэтому открытие снимка не зависит от числа строк.
+Снимок привязан к размеру, времени изменения и хешу CSV и игнорируется,
+как только исходный файл меняется.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import SNAPSHOT_SUFFIX
+
+MAGIC = b"CANDSNAP1\n"
+ALIGN = 64
+# Хешируются начало и конец CSV: проверка ключа остаётся O(1) по размеру файла
+HASH_BLOCK = 1 << 16
+
+
+class PackedStrings:
+    """Строки в виде одного UTF-8 буфера и смещений; декодируются по запросу."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def pack(cls, values) -> "PackedStrings":
+        encoded = [str(v).encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+                  out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            return self.data[start:end].tobytes().decode("utf-8")
+        if isinstance(index, slice) and index.step in (None, 1):
+            # Срез — вид на тот же буфер: смещения абсолютные
+            start, stop, _ = index.indices(len(self))
+            return PackedStrings(self.data, self.offsets[start:max(start, stop) + 1])
+        return np.array([self[int(i)] for i in np.arange(len(self))[index]], dtype=object)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def snapshot_path(csv_path: str) -> str:
+    return csv_path + SNAPSHOT_SUFFIX
+
+
+def source_key(csv_path: str) -> Dict[str, Any]:
+    """Ключ актуальности снимка: размер, mtime и хеш CSV."""
+    st = os.stat(csv_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(csv_path, "rb") as f:
+        digest.update(f.read(HASH_BLOCK))
+        if st.st_size > HASH_BLOCK:
+            f.seek(max(HASH_BLOCK, st.st_size - HASH_BLOCK))
+            digest.update(f.read())
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest.hexdigest()}
+
+
+def write_snapshot(csv_path: str, columns: Dict[str, Any]) -> bool:
+    """Записывает снимок колонок атомарно (через временный файл)."""
+    try:
+        key = source_key(csv_path)
+    except OSError:
+        return False
+
+    header: Dict[str, Any] = {"key": key, "lists": {}, "arrays": {}, "strings": {}}
+    blocks = []
+    position = 0
+
+    def add_block(arr: np.ndarray) -> Dict[str, Any]:
+        nonlocal position
+        arr = np.ascontiguousarray(arr)
+        position += -position % ALIGN
+        meta = {"offset": position, "dtype": arr.dtype.str, "length": len(arr)}
+        blocks.append((position, arr))
+        position += arr.nbytes
+        return meta
+
+    for name, value in columns.items():
+        if isinstance(value, list):
+            header["lists"][name] = value
+        elif isinstance(value, PackedStrings) or (
+            isinstance(value, np.ndarray) and value.dtype == object
+        ):
+            packed = value if isinstance(value, PackedStrings) else PackedStrings.pack(value)
+            header["strings"][name] = {
+                "data": add_block(packed.data),
+                "offsets": add_block(packed.offsets),
+            }
+        else:
+            header["arrays"][name] = add_block(np.asarray(value))
+
+    raw_header = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = len(MAGIC) + 8 + len(raw_header)
+    data_start = prefix + (-prefix % ALIGN)
+
+    path = snapshot_path(csv_path)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(raw_header).to_bytes(8, "little"))
+            f.write(raw_header)
+            f.write(b"\0" * (data_start - prefix))
+            for offset, arr in blocks:
+                f.seek(data_start + offset)
+                f.write(arr.tobytes())
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def read_snapshot(csv_path: str) -> Optional[Dict[str, Any]]:
+    """Открывает снимок через memmap; None, если его нет или он устарел."""
+    path = snapshot_path(csv_path)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        if header["key"] != source_key(csv_path):
+            return None
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+
+    prefix = len(MAGIC) + 8 + header_len
+    data_start = prefix + (-prefix % ALIGN)
+
+    def view(meta: Dict[str, Any]) -> np.ndarray:
+        dtype = np.dtype(meta["dtype"])
+        start = data_start + meta["offset"]
+        # Обычный ndarray поверх отображения: поэлементный доступ к memmap медленнее
+        return buf[start:start + meta["length"] * dtype.itemsize].view(dtype).view(np.ndarray)
+
+    columns: Dict[str, Any] = dict(header["lists"])
+    for name, meta in header["arrays"].items():
+        columns[name] = view(meta)
+    for name, meta in header["strings"].items():
+        columns[name] = PackedStrings(view(meta["data"]), view(meta["offsets"]))
+    return columns
+
+
+def invalidate_snapshot(csv_path: str):
+    """Удаляет снимок, например после дозаписи в CSV."""
+    try:
+        os.remove(snapshot_path(csv_path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,24 @@
+# test_candidate_writer.py
+import candidate_manager
+from candidate_manager import Candidate, CandidateWriter, save_candidate
+
+
+def _rows(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def test_save_candidate_reaches_disk_immediately(tmp_path, monkeypatch):
+    path = tmp_path / "candidates.csv"
+    monkeypatch.setattr(candidate_manager, "DB_PATH", str(path))
+    save_candidate(Candidate("Анна", ["Python"], "middle", 3, ["очно"], 150000))
+    assert len(_rows(path)) == 1
+
+
+def test_partial_batch_is_flushed_on_close(tmp_path):
+    path = tmp_path / "export.csv"
+    with CandidateWriter(path=str(path), batch_size=100, flush_interval=3600) as writer:
+        writer.write(Candidate("Анна", ["Python"], "middle", 3, ["очно"], 150000))
+        # Интервал проверяется только при записи: пачка ещё в буфере
+        assert _rows(path) == []
+    assert len(_rows(path)) == 1
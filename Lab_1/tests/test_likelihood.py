@@ -0,0 +1,31 @@
+# test_likelihood.py
+import math
+
+import numpy as np
+
+from candidate_manager import Candidate, CandidateTable
+from expert_system import bayesian_score
+from likelihood import log_scores
+
+CANDIDATES = [
+    Candidate("Анна", ["Python"], "Middle", 3, ["удалённо"], 150000),
+    Candidate("Борис", ["Java", "Go"], "senior", 7, ["офис"], 0),
+    Candidate("Вера", [], "junior", 0, [], 1000000),
+]
+PROFILES = [
+    {"languages": ["python"], "level": "middle", "years_range": (2, 5),
+     "formats": [], "salary_range": (0, 140000)},
+    {"languages": ["Rust"], "level": "", "years_range": (0, float("inf")),
+     "formats": ["офис"], "salary_range": (100000, float("inf"))},
+    {"languages": [], "level": "lead", "years_range": (10, 12),
+     "formats": [], "salary_range": (0, 0)},
+]
+
+
+def test_scalar_score_matches_table_scores():
+    table = CandidateTable.from_candidates(CANDIDATES)
+    for profile in PROFILES:
+        expected = np.exp(log_scores(table, profile))
+        scores = [bayesian_score(c, profile) for c in CANDIDATES]
+        assert scores == expected.tolist()
+        assert all(math.isfinite(s) for s in scores)
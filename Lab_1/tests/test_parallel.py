@@ -0,0 +1,38 @@
+# test_parallel.py
+import random
+
+import parallel
+from candidate_manager import Candidate, CandidateTable
+from config import LANGUAGES, WORK_FORMATS
+from expert_system import recommend
+from parallel import ParallelRecommender
+
+FLAGS = {"relaxed": False, "all": False, "why": False, "explain": False, "bayes": False}
+
+
+def _table(n=500):
+    rnd = random.Random(0)
+    return CandidateTable.from_candidates(
+        Candidate(f"Кандидат {i}", rnd.sample(LANGUAGES, 2), rnd.choice(["junior", "middle"]),
+                  rnd.randint(0, 15), rnd.sample(WORK_FORMATS, 1), rnd.randint(30, 300) * 1000)
+        for i in range(n)
+    )
+
+
+def test_pool_matches_sequential_recommend():
+    table = _table()
+    profile = {"languages": ["Python", "Go"], "level": "middle", "years_range": (2, 10),
+               "formats": [], "salary_range": (0, 200000)}
+    with ParallelRecommender(table, workers=2) as pool:
+        for bayes in (False, True):
+            flags = dict(FLAGS, bayes=bayes)
+            assert pool.recommend(profile, flags, top_k=20) == recommend(
+                table, profile, flags, top_k=20, use_cache=False)
+        assert pool.recommend(profile, FLAGS) == recommend(table, profile, FLAGS, use_cache=False)
+
+
+def test_worker_tables_have_names():
+    table = _table(50)
+    with ParallelRecommender(table, workers=2) as pool:
+        shard = pool._pool.apply(parallel._shard, (10, 20))
+    assert [c.name for c in shard] == [c.name for c in table[10:20]]
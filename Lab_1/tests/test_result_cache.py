@@ -0,0 +1,47 @@
+# test_result_cache.py
+import gc
+import weakref
+
+from candidate_index import CandidateIndex
+from candidate_manager import Candidate, CandidateTable
+from expert_system import RESULT_CACHE, recommend
+
+PROFILE = {
+    "languages": ["Python"],
+    "level": "",
+    "years_range": (0, float("inf")),
+    "formats": [],
+    "salary_range": (0, float("inf")),
+}
+FLAGS = {"relaxed": False, "all": False, "why": False, "explain": False, "bayes": False}
+
+
+def _table():
+    return CandidateTable.from_candidates([
+        Candidate("Анна", ["Python"], "middle", 3, ["удалённо"], 150000),
+        Candidate("Борис", ["Java"], "senior", 7, ["офис"], 250000),
+    ])
+
+
+def test_replaced_source_is_collected():
+    RESULT_CACHE.clear()
+    table = _table()
+    index = CandidateIndex(table)
+    for source in (table, index):
+        for bayes in (False, True):
+            recommend(source, PROFILE, dict(FLAGS, bayes=bayes))
+    assert len(RESULT_CACHE) == 4
+
+    refs = [weakref.ref(table), weakref.ref(index)]
+    del source, table, index
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert len(RESULT_CACHE) == 0
+
+
+def test_cached_result_is_reused():
+    table = _table()
+    first = recommend(table, PROFILE, FLAGS)
+    hits = RESULT_CACHE.hits
+    assert recommend(table, PROFILE, FLAGS) == first
+    assert RESULT_CACHE.hits == hits + 1
@@ -0,0 +1,46 @@
+# test_vocab_search.py
+from candidate_index import CandidateIndex
+from candidate_manager import Candidate, CandidateTable, FORMAT_VOCAB, LANGUAGE_VOCAB
+from expert_system import recommend
+
+FLAGS = {"relaxed": False, "all": False, "why": False, "explain": False, "bayes": False}
+
+
+def _table():
+    return CandidateTable.from_candidates([
+        Candidate("Анна", ["Python"], "middle", 3, ["удалённо"], 150000),
+        Candidate("Борис", ["Java", "Go"], "senior", 7, ["офис"], 250000),
+    ])
+
+
+def test_unknown_profile_values_do_not_grow_vocab():
+    index = CandidateIndex(_table())
+    languages, formats = len(LANGUAGE_VOCAB), len(FORMAT_VOCAB)
+    for i in range(20):
+        profile = {
+            "languages": [f"junk{i}"],
+            "level": "",
+            "years_range": (0, float("inf")),
+            "formats": [f"junk{i}"],
+            "salary_range": (0, float("inf")),
+        }
+        for all_flag in (False, True):
+            flags = dict(FLAGS, all=all_flag)
+            assert recommend(index, profile, flags) == []
+            assert recommend(_table(), profile, flags) == []
+    assert len(LANGUAGE_VOCAB) == languages
+    assert len(FORMAT_VOCAB) == formats
+
+
+def test_unknown_value_matches_nothing_next_to_known():
+    profile = {
+        "languages": ["Python", "junk"],
+        "level": "",
+        "years_range": (0, float("inf")),
+        "formats": [],
+        "salary_range": (0, float("inf")),
+    }
+    table = _table()
+    assert [c.name for c in recommend(table, profile, FLAGS)] == ["Анна"]
+    assert recommend(table, profile, dict(FLAGS, all=True)) == []
+    assert [c.name for c in recommend(CandidateIndex(table), profile, FLAGS)] == ["Анна"]
@@ -0,0 +1,137 @@
+# vocab_search.py
+"""Нечёткий поиск по словарям языков и форматов для мягкого режима (--relaxed).
+
+Для каждого значения словаря (без учёта регистра) хранится множество
+символьных триграмм, по ним строится обратный индекс триграмма -> номера
+значений. Запрос сопоставляется со словарём, а не с кандидатами:
+- подстрока ("Type" -> TypeScript), для коротких запросов — начало слова
+  ("C" -> C++, C#);
+- аббревиатура по заглавным буквам ("JS" -> JavaScript);
+- опечатка: значения с общими триграммами и расстоянием Дамерау —
+  Левенштейна не больше 1 (2 для длинных запросов): "Pyton" -> Python.
+Результат — битовая маска значений словаря (как у Vocabulary.mask).
+"""
+import re
+from typing import Dict, List, Sequence, Set
+
+from candidate_manager import Vocabulary
+
+# Запросы короче этой длины ищутся по началу слова, а не по любой подстроке
+MIN_SUBSTRING = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def acronym(value: str) -> str:
+    """Аббревиатура по заглавным буквам и началам слов: JavaScript -> js."""
+    letters = [w[0] for w in re.split(r"[\s_\-./]+", value) if w]
+    capitals = re.findall(r"(?<=[a-zа-яё])[A-ZА-ЯЁ]", value)
+    return "".join(letters + capitals).lower()
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Расстояние Дамерау — Левенштейна (с перестановкой соседних символов)."""
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class TrigramIndex:
+    """Триграммный индекс по значениям словаря; дополняется по мере роста словаря."""
+
+    def __init__(self, vocab: Vocabulary):
+        self.vocab = vocab
+        self._folded: List[str] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._words: Dict[str, int] = {}
+        self._acronyms: Dict[str, int] = {}
+        self._cache: Dict[str, int] = {}
+
+    def _sync(self):
+        if len(self._folded) == len(self.vocab):
+            return
+        for idx in range(len(self._folded), len(self.vocab)):
+            value = self.vocab.values[idx]
+            folded = value.lower()
+            self._folded.append(folded)
+            for gram in trigrams(f"${folded}$"):
+                self._postings.setdefault(gram, set()).add(idx)
+            for word in re.split(r"[\s_\-./]+", folded):
+                if word:
+                    self._words[word] = self._words.get(word, 0) | (1 << idx)
+            key = acronym(value)
+            if len(key) >= 2:
+                self._acronyms[key] = self._acronyms.get(key, 0) | (1 << idx)
+        self._cache.clear()
+
+    def lookup(self, query: str) -> int:
+        """Маска значений словаря, подходящих под запрос в мягком режиме."""
+        q = query.strip().lower()
+        if not q:
+            return 0
+        self._sync()
+        mask = self._cache.get(q)
+        if mask is None:
+            mask = self._cache[q] = self._substring(q) | self._acronyms.get(q, 0) or self._typo(q)
+        return mask
+
+    def _substring(self, q: str) -> int:
+        if len(q) < MIN_SUBSTRING:
+            return _or(m for word, m in self._words.items() if word.startswith(q))
+        grams = trigrams(q)
+        ids = set.intersection(*(self._postings.get(g, set()) for g in grams))
+        return _or(1 << i for i in ids if q in self._folded[i])
+
+    def _typo(self, q: str) -> int:
+        limit = 1 if len(q) <= 5 else 2
+        ids = set().union(*(self._postings.get(g, set()) for g in trigrams(f"${q}$")))
+        best, mask = limit + 1, 0
+        for i in ids:
+            distance = edit_distance(q, self._folded[i])
+            if distance < best:
+                best, mask = distance, 1 << i
+            elif distance == best:
+                mask |= 1 << i
+        return mask if best <= limit else 0
+
+
+def _or(masks) -> int:
+    result = 0
+    for m in masks:
+        result |= m
+    return result
+
+
+_indexes: Dict[int, TrigramIndex] = {}
+
+
+def search_index(vocab: Vocabulary) -> TrigramIndex:
+    index = _indexes.get(id(vocab))
+    if index is None or index.vocab is not vocab:
+        index = _indexes[id(vocab)] = TrigramIndex(vocab)
+    return index
+
+
+def pref_groups(vocab: Vocabulary, prefs: Sequence[str], relaxed: bool) -> List[int]:
+    """Маски предпочтений по одной на каждое значение профиля.
+
+    В строгом режиме маска — бит самого значения, в мягком — все значения
+    словаря, найденные для него TrigramIndex. Значения профиля не попадают
+    в словарь: неизвестному значению соответствует маска 0 (не совпадает
+    ни с чем) в обоих режимах.
+    """
+    if not relaxed:
+        ids = [vocab.ids.get(value) for value in prefs]
+        return [0 if idx is None else 1 << idx for idx in ids]
+    index = search_index(vocab)
+    return [index.lookup(value) for value in prefs]
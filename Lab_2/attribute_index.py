@@ -0,0 +1,237 @@
+"""Материализованное представление атрибутов кандидатов и вакансий.
+
+AttributeIndex один раз читает из RDF графа всё, что нужно для
+сопоставления кандидатов с вакансиями, и хранит это в готовом виде:
+навыки кандидатов (hasSkill) и вакансий (requiresSkill) — словари
+множеств, стаж, зарплата, минимальный стаж и максимальная зарплата —
+массивы NumPy, уровни опыта — порядковые коды. Индекс подписан на
+события хранилища rdflib (добавление и удаление троек): затронутые
+субъекты запоминаются и пересчитываются при следующем обращении, поэтому
+add_individual и update_ontology не требуют перестройки. Удаление по
+шаблону без субъекта (CLEAR, DROP) приводит к полной перестройке.
+"""
+from itertools import product
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from rdflib import Graph, Namespace, RDF, RDFS
+from rdflib.events import Event
+from rdflib.store import TripleAddedEvent, TripleRemovedEvent
+from rdflib.term import Node
+
+# Порядок уровней опыта; прочие уровни получают коды после них
+LEVEL_ORDER = ("junior", "middle", "senior", "lead")
+NO_CODE = -1
+
+# Баллы совпадения с вакансией по каждому требованию
+SKILL_POINTS, LEVEL_POINTS, YEARS_POINTS, SALARY_POINTS = 30, 30, 20, 20
+
+# Строка требований вакансии: (название, навык, код уровня, мин. стаж, макс. зарплата)
+Requirement = Tuple[str, Optional[str], int, Optional[int], Optional[int]]
+
+
+def local_name(uri: str) -> str:
+    return uri.split('#')[-1] if '#' in uri else uri
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+class AttributeIndex:
+    """Навыки, уровни, стаж и зарплаты кандидатов и требования вакансий."""
+
+    def __init__(self, graph: Graph, ns: Namespace):
+        self.graph = graph
+        self.ns = ns
+        self.candidate_predicates = (ns.hasSkill, ns.hasExperienceLevel,
+                                     ns.hasYearsOfExperience, ns.expectedSalary)
+        self._reset()
+        self._stale = True
+
+    def _reset(self):
+        self.level_codes: Dict[str, int] = {level: code for code, level in enumerate(LEVEL_ORDER)}
+        # Кандидаты: номер строки массивов по URI
+        self.candidate_rows: Dict[Node, int] = {}
+        self.candidate_skills: Dict[Node, Set[str]] = {}
+        self.years = np.zeros(0, dtype=np.int64)
+        self.salary = np.zeros(0, dtype=np.int64)
+        self.level = np.zeros(0, dtype=np.int32)
+        # Заполнены все четыре свойства (иначе вакансии не подбираются)
+        self.complete = np.zeros(0, dtype=bool)
+        # Вакансии: строки требований по URI в порядке появления
+        self.vacancy_skills: Dict[Node, Set[str]] = {}
+        self.vacancy_requirements: Dict[Node, List[Requirement]] = {}
+        self.vacancy_names: List[str] = []
+        self.required_skill = np.zeros(0, dtype=np.int32)
+        self.required_level = np.zeros(0, dtype=np.int32)
+        self.min_years = np.zeros(0, dtype=np.float64)
+        self.max_salary = np.zeros(0, dtype=np.float64)
+        self._skill_columns: Dict[str, int] = {}
+        self._dirty: Set[Node] = set()
+
+    def attach(self):
+        """Подписывает индекс на изменения хранилища графа."""
+        dispatcher = self.graph.store.dispatcher
+        dispatcher.subscribe(TripleAddedEvent, self._on_change)
+        dispatcher.subscribe(TripleRemovedEvent, self._on_change)
+
+    def detach(self):
+        for handlers in (self.graph.store.dispatcher.get_map() or {}).values():
+            if self._on_change in handlers:
+                handlers.remove(self._on_change)
+
+    def _on_change(self, event: Event):
+        if self._stale:
+            return
+        subject = event.triple[0]
+        if subject is None:
+            self._stale = True
+        else:
+            self._dirty.add(subject)
+
+    # --- Обновление ---
+
+    def refresh(self):
+        """Пересчитывает изменившиеся субъекты (или весь индекс)."""
+        if self._stale:
+            self._build()
+        elif self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self._update(dirty)
+
+    def _build(self):
+        self._reset()
+        self._stale = False
+        subjects = dict.fromkeys(self.graph.subjects(RDF.type, self.ns.Vacancy))
+        for predicate in self.candidate_predicates:
+            subjects.update(dict.fromkeys(self.graph.subjects(predicate, None)))
+        self._update(subjects)
+
+    def _update(self, subjects):
+        rows: List[Tuple[int, int, int, bool]] = []
+        vacancies_changed = False
+        for subject in subjects:
+            properties: Dict[Node, List[Node]] = {}
+            for predicate, value in self.graph.predicate_objects(subject):
+                properties.setdefault(predicate, []).append(value)
+
+            if subject in self.candidate_rows or any(p in properties for p in self.candidate_predicates):
+                skills, *values = self._candidate_values(properties)
+                self.candidate_skills[subject] = skills
+                row = self.candidate_rows.get(subject)
+                if row is None:
+                    self.candidate_rows[subject] = len(self.years) + len(rows)
+                    rows.append(tuple(values))
+                else:
+                    self.level[row], self.years[row], self.salary[row], self.complete[row] = values
+
+            requirements = self._vacancy_values(properties)
+            if requirements or subject in self.vacancy_requirements:
+                vacancies_changed = True
+                if requirements:
+                    self.vacancy_requirements[subject] = requirements
+                    self.vacancy_skills[subject] = {r[1] for r in requirements if r[1] is not None}
+                else:
+                    del self.vacancy_requirements[subject]
+                    del self.vacancy_skills[subject]
+
+        if rows:
+            level, years, salary, complete = zip(*rows)
+            self.level = np.concatenate([self.level, np.array(level, dtype=np.int32)])
+            self.years = np.concatenate([self.years, np.array(years, dtype=np.int64)])
+            self.salary = np.concatenate([self.salary, np.array(salary, dtype=np.int64)])
+            self.complete = np.concatenate([self.complete, np.array(complete, dtype=bool)])
+        if vacancies_changed:
+            self._rebuild_vacancy_arrays()
+
+    def _level_code(self, level: str) -> int:
+        if not level:
+            return NO_CODE
+        return self.level_codes.setdefault(level.lower(), len(self.level_codes))
+
+    def _candidate_values(self, properties: Dict[Node, List[Node]]) -> Tuple[Set[str], int, int, int, bool]:
+        """Навыки, код уровня, стаж, зарплата и полнота профиля кандидата.
+
+        Берутся первые непустые уровень, стаж и зарплата — как при разборе
+        строк SPARQL запроса в прежнем _find_vacancy_matches.
+        """
+        ns = self.ns
+        skills = {local_name(str(v)) for v in properties.get(ns.hasSkill, []) if v}
+        level = next((local_name(str(v)) for v in properties.get(ns.hasExperienceLevel, [])
+                      if v and local_name(str(v))), "")
+        years = next((y for y in map(_as_int, properties.get(ns.hasYearsOfExperience, [])) if y), 0)
+        salary = next((s for s in map(_as_int, properties.get(ns.expectedSalary, [])) if s), 0)
+        complete = all(properties.get(p) for p in self.candidate_predicates)
+        return skills, self._level_code(level), years, salary, complete
+
+    def _vacancy_values(self, properties: Dict[Node, List[Node]]) -> List[Requirement]:
+        """Строки требований вакансии (по одной на сочетание значений свойств)."""
+        ns = self.ns
+        if ns.Vacancy not in properties.get(RDF.type, []):
+            return []
+        skills = [local_name(str(v)) if v else None for v in properties.get(ns.requiresSkill, [])]
+        levels = [self._level_code(local_name(str(v))) if v else NO_CODE
+                  for v in properties.get(ns.requiresExperienceLevel, [])]
+        min_years = [_as_int(v) for v in properties.get(ns.minYearsOfExperience, [])]
+        max_salary = [_as_int(v) for v in properties.get(ns.maxSalary, [])]
+        return [
+            (str(label) if label else "Unknown",) + combination
+            for label in properties.get(RDFS.label, [])
+            for combination in product(skills or [None], levels or [NO_CODE],
+                                       min_years or [None], max_salary or [None])
+        ]
+
+    def _rebuild_vacancy_arrays(self):
+        # Вакансий немного: массивы требований собираются заново целиком
+        rows = [r for requirements in self.vacancy_requirements.values() for r in requirements]
+        self._skill_columns = {}
+        for _, skill, _, _, _ in rows:
+            if skill is not None:
+                self._skill_columns.setdefault(skill, len(self._skill_columns))
+        # Отсутствующий навык указывает на последний, всегда пустой столбец
+        missing = len(self._skill_columns)
+        self.vacancy_names = [r[0] for r in rows]
+        self.required_skill = np.array([missing if r[1] is None else self._skill_columns[r[1]] for r in rows],
+                                       dtype=np.int32)
+        self.required_level = np.array([r[2] for r in rows], dtype=np.int32)
+        self.min_years = np.array([np.nan if r[3] is None else r[3] for r in rows], dtype=np.float64)
+        self.max_salary = np.array([np.nan if r[4] is None else r[4] for r in rows], dtype=np.float64)
+
+    # --- Сопоставление ---
+
+    def vacancy_scores(self, candidates: List[Node]) -> np.ndarray:
+        """Матрица баллов "кандидаты x строки требований вакансий".
+
+        Кандидаты без полного профиля (или отсутствующие) получают нули.
+        Названия вакансий по столбцам — vacancy_names.
+        """
+        self.refresh()
+        n, m = len(candidates), len(self.vacancy_names)
+        if not n or not m or not len(self.years):
+            return np.zeros((n, m), dtype=np.int32)
+        rows = np.array([self.candidate_rows.get(c, -1) for c in candidates], dtype=np.int64)
+        known = rows >= 0
+        rows[~known] = 0
+        complete = known & self.complete[rows]
+
+        has_skill = np.zeros((n, len(self._skill_columns) + 1), dtype=bool)
+        for i, candidate in enumerate(candidates):
+            for skill in self.candidate_skills.get(candidate, ()):
+                column = self._skill_columns.get(skill)
+                if column is not None:
+                    has_skill[i, column] = True
+
+        level = self.level[rows][:, None]
+        years = self.years[rows][:, None]
+        salary = self.salary[rows][:, None]
+        # Сравнение с NaN (требование не задано) дает False
+        scores = (SKILL_POINTS * has_skill[:, self.required_skill]
+                  + LEVEL_POINTS * ((level != NO_CODE) & (level == self.required_level))
+                  + YEARS_POINTS * (years >= self.min_years)
+                  + SALARY_POINTS * (salary <= self.max_salary)).astype(np.int32)
+        scores[~complete] = 0
+        return scores
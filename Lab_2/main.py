@@ -2,7 +2,8 @@ import sys
 sys.path.append("../Lab_1/")
 
 from config import FLAGS, LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS
-from candidate_manager import load_candidates, save_candidate, Candidate
+from candidate_manager import Candidate
+from candidate_store import load_from_store, save_to_store
 from expert_system import get_user_profile, recommend
 from ontology_interface import OntologyInterface
 
@@ -52,7 +53,7 @@ def add_candidate_flow(ontology_interface: OntologyInterface):
         return
 
     candidate = Candidate(name=name, language=langs, level=level, years=years, format=fmts, salary=salary)
-    save_candidate(candidate)
+    save_to_store(candidate)
     
     # Добавляем кандидата в онтологию
     candidate_data = {
@@ -68,7 +69,7 @@ def add_candidate_flow(ontology_interface: OntologyInterface):
 # !!! UPDATED
 def run_expert_system_flow(flags, ontology_interface: OntologyInterface):
     print("\n--- Запуск экспертной системы ---")
-    candidates = load_candidates()
+    candidates = load_from_store()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -129,6 +130,8 @@ def main():
         elif choice == "4":
             ontology_interface.create_sample_vacancies()
         elif choice == "5":
+            # Дожидаемся фонового сворачивания журнала онтологии
+            ontology_interface.om.close()
             print("До свидания!")
             break
         else:
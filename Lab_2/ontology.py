@@ -1,8 +1,12 @@
 import os
-from typing import List, Dict, Set, Any, Optional
+from typing import List, Dict, Set, Any, Optional, Union
 from dataclasses import dataclass
 from rdflib import Graph, Namespace, RDF, RDFS, OWL, XSD
 from rdflib.term import URIRef, Literal
+from rdflib.plugins.sparql.sparql import Query
+from sqlite_store import SQLiteStore
+from ontology_journal import Compactor, JournaledMemory, OntologyJournal
+from attribute_index import AttributeIndex
 
 @dataclass
 class OntologyClass:
@@ -22,14 +26,40 @@ class OntologyIndividual:
     class_type: str
     properties: Dict[str, Any]
 
+def default_store_path(ontology_path: str) -> str:
+    """Файл SQLite хранилища по умолчанию: рядом с ontology_path, расширение .sqlite3."""
+    return os.path.splitext(ontology_path)[0] + ".sqlite3"
+
 class OntologyManager:
     """Менеджер для создания и работы с онтологиями."""
     
-    def __init__(self, ontology_path: str = "data/ontology.ttl"):
+    def __init__(self, ontology_path: str = "data/ontology.ttl", backend: str = "turtle",
+                 store_path: Optional[str] = None):
+        """backend="turtle" держит граф в памяти: снимок хранится в
+        ontology_path, изменения дописываются в журнал (см. ontology_journal).
+        backend="sqlite" открывает граф прямо в файле SQLite (store_path,
+        по умолчанию рядом с ontology_path с расширением .sqlite3)."""
         self.ontology_path = ontology_path
-        self.graph = Graph()
+        self.backend = backend
+        if backend == "sqlite":
+            self.store_path = store_path or default_store_path(ontology_path)
+            self.graph = Graph(store=SQLiteStore())
+            self.graph.open(self.store_path, create=True)
+        elif backend == "turtle":
+            self.store_path = None
+            self.store = JournaledMemory()
+            self.graph = Graph(store=self.store)
+            self.journal = OntologyJournal(ontology_path + ".journal")
+            self.compactor = Compactor(ontology_path, self.journal)
+            self.store.journal = self.journal
+        else:
+            raise ValueError(f"Неизвестное хранилище онтологии: {backend}")
         self.base_ns = Namespace("http://example.org/it_recruitment#")
         self.init_namespaces()
+        # Атрибуты кандидатов и вакансий для подбора; индекс обновляется по
+        # событиям хранилища при add_individual и update_ontology
+        self.attributes = AttributeIndex(self.graph, self.base_ns)
+        self.attributes.attach()
         self.classes: Dict[str, OntologyClass] = {}
         self.individuals: Dict[str, OntologyIndividual] = {}
         
@@ -153,23 +183,63 @@ class OntologyManager:
     
     def save_ontology(self):
         """Сохраняет онтологию в файл."""
+        if self.backend == "sqlite":
+            # Тройки уже записаны в базу: достаточно зафиксировать транзакцию
+            self.graph.commit()
+            print(f"Онтология сохранена в: {self.store_path}")
+            return
         os.makedirs(os.path.dirname(self.ontology_path), exist_ok=True)
-        self.graph.serialize(destination=self.ontology_path, format='turtle')
+        # Изменения уже в журнале: фиксируем его, а полный снимок пишется
+        # только при сворачивании (первый снимок — сразу, остальные в фоне)
+        self.journal.sync()
+        if self.compactor.needed():
+            self.compactor.start(self.graph, background=os.path.exists(self.ontology_path))
         print(f"Онтология сохранена в: {self.ontology_path}")
     
     def load_ontology(self):
         """Загружает онтологию из файла."""
-        if os.path.exists(self.ontology_path):
-            self.graph.parse(self.ontology_path, format='turtle')
-            print(f"Онтология загружена из: {self.ontology_path}")
+        if self.backend == "sqlite":
+            if len(self.graph) > 0:
+                print(f"Онтология открыта из: {self.store_path}")
+                return True
+            journal = OntologyJournal(self.ontology_path + ".journal")
+            journals = [p for p in (journal.compacting_path, journal.path) if os.path.exists(p)]
+            if not os.path.exists(self.ontology_path) and not journals:
+                return False
+            # Однократный перенос в пустую базу: снимок Turtle и журнал
+            # изменений, ещё не свёрнутый в снимок
+            if os.path.exists(self.ontology_path):
+                self.graph.parse(self.ontology_path, format='turtle')
+            journal.replay(self.graph)
+            self.graph.commit()
+            print(f"Онтология перенесена из {self.ontology_path} в {self.store_path}")
             return True
-        return False
+        journals = [p for p in (self.journal.compacting_path, self.journal.path) if os.path.exists(p)]
+        if not os.path.exists(self.ontology_path) and not journals:
+            return False
+        # Загруженные из снимка и журнала тройки в журнал не пишутся
+        self.store.journal = None
+        try:
+            if os.path.exists(self.ontology_path):
+                self.graph.parse(self.ontology_path, format='turtle')
+            replayed = self.journal.replay(self.graph)
+        finally:
+            self.store.journal = self.journal
+        print(f"Онтология загружена из: {self.ontology_path}")
+        if replayed:
+            print(f"Применено изменений из журнала: {replayed}")
+        return True
     
-    def query_ontology(self, sparql_query: str) -> List[Dict]:
-        """Выполняет SPARQL запрос к онтологии."""
+    def query_ontology(self, sparql_query: Union[str, Query],
+                       bindings: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Выполняет SPARQL запрос к онтологии.
+
+        Запрос может быть строкой или подготовленным prepareQuery объектом;
+        bindings задает значения переменных запроса (initBindings).
+        """
         try:
             results = []
-            query_result = self.graph.query(sparql_query)
+            query_result = self.graph.query(sparql_query, initBindings=bindings)
             
             for row in query_result:
                 result_row = {}
@@ -182,4 +252,12 @@ class OntologyManager:
             return results
         except Exception as e:
             print(f"Ошибка выполнения SPARQL запроса: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def close(self):
+        """Закрывает хранилище, фиксируя незаписанные изменения."""
+        if self.backend == "sqlite":
+            self.graph.close(commit_pending_transaction=True)
+        else:
+            self.compactor.wait()
+            self.journal.close()
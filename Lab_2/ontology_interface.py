@@ -4,14 +4,14 @@ sys.path.append("../Lab_1/")
 from typing import List, Dict, Any
 from ontology import OntologyManager, OntologyIndividual
 from reasoner import OntologyReasoner
-from config import LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS
+from config import LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS, ONTOLOGY_BACKEND
 
 
 class OntologyInterface:
     """Интерактивный интерфейс для работы с онтологиями."""
     
     def __init__(self):
-        self.om = OntologyManager()
+        self.om = OntologyManager(backend=ONTOLOGY_BACKEND)
         self.reasoner = OntologyReasoner(self.om)
         self._initialize_ontology()
     
@@ -214,13 +214,13 @@ class OntologyInterface:
             print("Кандидаты не найдены.")
             return
         
-        all_inferences = []
-        for candidate in candidates:
-            candidate_name = candidate.get('name')
+        # Все кандидаты анализируются за один проход по графу
+        candidate_names = [candidate.get('name') for candidate in candidates]
+        all_inferences = self.reasoner.reason_about_candidates(candidate_names)
+        for candidate_name in candidate_names:
             print(f"\nАнализ {candidate_name}...")
             
-            inferences = self.reasoner.reason_about_candidate(candidate_name)
-            all_inferences.extend(inferences)
+            inferences = all_inferences[candidate_name]
             
             # Показываем только основные выводы для каждого кандидата
             vacancy_matches = [inf for inf in inferences if inf["type"] == "vacancy_match"]
@@ -0,0 +1,233 @@
+"""Журнал изменений онтологии в формате N-Triples.
+
+Вместо полной перезаписи Turtle файла после каждого изменения
+OntologyManager дописывает добавленные и удалённые тройки в журнал
+(`<ontology>.journal`): строка "+ <s> <p> <o> ." или "- <s> <p> <o> .".
+fsync выполняется пачками — по числу строк или по времени с прошлой
+фиксации — и принудительно при save_ontology. При загрузке журнал
+проигрывается поверх последнего снимка (ontology.ttl). Когда журнал
+вырастает больше порога, фоновый поток сворачивает его в новый снимок.
+
+Сворачивание: текущий журнал переименовывается в `.journal.compacting`,
+запись продолжается в новый журнал, поток записывает копию графа во
+временный файл и атомарно заменяет им снимок, после чего удаляет
+`.compacting`. Повторное проигрывание уже учтённых изменений не меняет
+граф, поэтому сбой на любом шаге не теряет данных. Пустые узлы между
+снимком и журналом не сопоставляются (в онтологии их нет).
+"""
+import os
+import shutil
+import threading
+import time
+from typing import IO, List, Optional, Tuple
+
+from rdflib import Graph
+from rdflib.plugins.serializers.nt import _nt_row
+from rdflib.plugins.stores.memory import Memory
+from rdflib.store import Store
+
+# Сколько строк журнала и сколько секунд можно держать без fsync
+JOURNAL_SYNC_BATCH = 1000
+JOURNAL_SYNC_INTERVAL = 1.0
+# Размер журнала (байт), после которого он сворачивается в новый снимок
+JOURNAL_COMPACT_SIZE = 1024 * 1024
+
+ADDED, REMOVED = "+", "-"
+
+
+class OntologyJournal:
+    """Дозапись изменений графа с групповым fsync."""
+
+    def __init__(self, path: str, sync_batch: int = JOURNAL_SYNC_BATCH,
+                 sync_interval: float = JOURNAL_SYNC_INTERVAL):
+        self.path = path
+        self.compacting_path = path + ".compacting"
+        self.sync_batch = sync_batch
+        self.sync_interval = sync_interval
+        self._file: Optional[IO[str]] = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, op: str, triple):
+        if self._file is None:
+            self._open()
+        self._file.write(f"{op} {_nt_row(triple)}")
+        self._pending += 1
+        if (self._pending >= self.sync_batch
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            # Отрезаем недописанную строку, оставшуюся после сбоя
+            with open(self.path, "rb+") as f:
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.seek(0)
+                        f.truncate(f.read().rfind(b"\n") + 1)
+        self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+
+    def sync(self):
+        """Фиксирует накопленные строки на диске: один fsync на пачку."""
+        self._last_sync = time.monotonic()
+        if self._file is None or not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def size(self) -> int:
+        """Размер журнала в байтах (с учётом ещё не сброшенных строк)."""
+        if self._file is not None:
+            self._file.flush()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def close(self):
+        self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def rotate(self):
+        """Переносит журнал в .compacting; следующие записи идут в новый файл."""
+        self.close()
+        if not os.path.exists(self.path):
+            return
+        if os.path.exists(self.compacting_path):
+            # Прошлое сворачивание не завершилось: изменения копятся в одном файле
+            with open(self.compacting_path, "ab") as dst, open(self.path, "rb") as src:
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.compacting_path)
+
+    def replay(self, graph: Graph) -> int:
+        """Применяет к графу .compacting и журнал; возвращает число строк."""
+        return sum(replay_journal(graph, p) for p in (self.compacting_path, self.path))
+
+
+def replay_journal(graph: Graph, path: str) -> int:
+    """Проигрывает журнал по порядку, подряд идущие строки одного вида — пачкой."""
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    op: Optional[str] = None
+    batch: List[str] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Недописанная последняя строка (сбой во время записи)
+                break
+            if line[0] != op:
+                _apply(graph, op, batch)
+                op, batch = line[0], []
+            batch.append(line[2:])
+            count += 1
+    _apply(graph, op, batch)
+    return count
+
+
+def _apply(graph: Graph, op: Optional[str], rows: List[str]):
+    if not rows:
+        return
+    if op == ADDED:
+        graph.parse(data="".join(rows), format="nt")
+    elif op == REMOVED:
+        for triple in Graph().parse(data="".join(rows), format="nt"):
+            graph.remove(triple)
+
+
+class JournaledMemory(Memory):
+    """Хранилище rdflib в памяти, записывающее изменения в журнал.
+
+    Пока journal равен None (загрузка снимка, проигрывание журнала),
+    изменения не записываются. События добавления и удаления троек
+    рассылаются подписчикам хранилища в обоих случаях.
+    """
+
+    def __init__(self, configuration=None, identifier=None):
+        super().__init__(configuration, identifier)
+        self.journal: Optional[OntologyJournal] = None
+
+    def add(self, triple, context, quoted: bool = False):
+        if self.journal is not None and not quoted and next(self.triples(triple, context), None) is None:
+            self.journal.write(ADDED, triple)
+        super().add(triple, context, quoted)
+
+    def remove(self, triple_pattern, context=None):
+        # Memory.remove не рассылает событий: удаленные тройки сообщаются
+        # подписчикам (см. attribute_index) здесь же
+        for triple, _ in list(self.triples(triple_pattern, context)):
+            if self.journal is not None:
+                self.journal.write(REMOVED, triple)
+            Store.remove(self, triple, context)
+        super().remove(triple_pattern, context)
+
+
+def write_snapshot(path: str, triples: List, namespaces: List[Tuple[str, str]]):
+    """Записывает граф в Turtle через временный файл и атомарную замену."""
+    graph = Graph()
+    for prefix, namespace in namespaces:
+        graph.bind(prefix, namespace)
+    graph.addN((s, p, o, graph) for s, p, o in triples)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        graph.serialize(destination=f, format="turtle")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Compactor:
+    """Сворачивание журнала в новый снимок в фоновом потоке."""
+
+    def __init__(self, snapshot_path: str, journal: OntologyJournal,
+                 threshold: int = JOURNAL_COMPACT_SIZE):
+        self.snapshot_path = snapshot_path
+        self.journal = journal
+        self.threshold = threshold
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def needed(self) -> bool:
+        return not os.path.exists(self.snapshot_path) or self.journal.size() > self.threshold
+
+    def start(self, graph: Graph, background: bool = True):
+        """Снимает копию графа и записывает её как новый снимок.
+
+        Копия троек берётся в вызывающем потоке, поэтому дальнейшие
+        изменения графа не мешают записи.
+        """
+        if self.running:
+            return
+        self.journal.rotate()
+        triples = list(graph)
+        namespaces = list(graph.namespaces())
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(triples, namespaces), daemon=True)
+            self._thread.start()
+        else:
+            self._run(triples, namespaces)
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, triples: List, namespaces: List[Tuple[str, str]]):
+        try:
+            write_snapshot(self.snapshot_path, triples, namespaces)
+            if os.path.exists(self.journal.compacting_path):
+                os.remove(self.journal.compacting_path)
+        except Exception as e:
+            # .compacting остаётся и проигрывается при загрузке
+            print(f"Ошибка сворачивания журнала онтологии: {e}")
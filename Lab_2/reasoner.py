@@ -1,8 +1,47 @@
 from typing import List, Dict, Any, Set, Tuple
+import numpy as np
 from rdflib import Graph, Namespace, RDF, RDFS, OWL
 from rdflib.plugins.sparql import prepareQuery
+from rdflib.term import URIRef
 from ontology import OntologyManager, OntologyIndividual
 
+# Запросы логического вывода. Кандидат передается через переменную
+# ?candidate (initBindings), а не подстановкой имени в текст запроса.
+QUERIES = {
+    "candidate_properties": """
+        SELECT ?property ?value WHERE {
+            ?candidate ?property ?value .
+        }
+    """,
+    "candidate_skills": """
+        SELECT ?skillName WHERE {
+            ?candidate rec:hasSkill ?skill .
+            ?skill rdfs:label ?skillName .
+        }
+    """,
+    "candidate_level": """
+        SELECT ?level WHERE {
+            ?candidate rec:hasExperienceLevel ?level .
+        }
+    """,
+    "candidate_years": """
+        SELECT ?years WHERE {
+            ?candidate rec:hasYearsOfExperience ?years .
+        }
+    """,
+    "candidate_salary": """
+        SELECT ?salary WHERE {
+            ?candidate rec:expectedSalary ?salary .
+        }
+    """,
+    "candidate_experience": """
+        SELECT ?years ?level WHERE {
+            ?candidate rec:hasYearsOfExperience ?years .
+            OPTIONAL { ?candidate rec:hasExperienceLevel ?level . }
+        }
+    """,
+}
+
 
 class OntologyReasoner:
     """Логический выводчик на основе онтологии."""
@@ -10,20 +49,24 @@ class OntologyReasoner:
     def __init__(self, ontology_manager: OntologyManager):
         self.om = ontology_manager
         self.inferred_facts: List[Dict] = []
+        # Запросы разбираются один раз: повторный вывод не тратит время на парсинг
+        namespaces = {"rec": self.om.base_ns, "rdf": RDF, "rdfs": RDFS}
+        self.queries = {name: prepareQuery(text, initNs=namespaces) for name, text in QUERIES.items()}
+    
+    def _candidate_uri(self, candidate_name: str) -> URIRef:
+        return self.om.base_ns[candidate_name.replace(" ", "_")]
+    
+    def _query(self, name: str, candidate_name: str = None) -> List[Dict]:
+        """Выполняет подготовленный запрос, подставляя URI кандидата в ?candidate."""
+        bindings = {"candidate": self._candidate_uri(candidate_name)} if candidate_name is not None else None
+        return self.om.query_ontology(self.queries[name], bindings)
     
     def reason_about_candidate(self, candidate_name: str) -> List[Dict]:
         """Выполняет логический вывод для конкретного кандидата."""
         inferred_facts = []
         
         # Проверяем, существует ли кандидат
-        candidate_query = """
-        PREFIX rec: <http://example.org/it_recruitment#>
-        SELECT ?property ?value WHERE {
-            rec:%s ?property ?value .
-        }
-        """ % candidate_name.replace(" ", "_")
-        
-        candidate_data = self.om.query_ontology(candidate_query)
+        candidate_data = self._query("candidate_properties", candidate_name)
         
         if not candidate_data:
             return [{"type": "error", "message": f"Кандидат {candidate_name} не найден в онтологии"}]
@@ -43,22 +86,59 @@ class OntologyReasoner:
         self.inferred_facts = inferred_facts
         return inferred_facts
     
+    def reason_about_candidates(self, candidate_names: List[str]) -> Dict[str, List[Dict]]:
+        """Пакетный логический вывод для многих кандидатов.
+
+        Свойства кандидата читаются одним обращением к индексу графа
+        (graph.predicate_objects) без SPARQL, а совпадения с вакансиями
+        берутся из одной матрицы баллов AttributeIndex. Для каждого
+        кандидата выводы совпадают с reason_about_candidate; inferred_facts
+        после вызова содержит выводы по всем найденным кандидатам.
+        """
+        names = list(dict.fromkeys(candidate_names))
+        scores = self.om.attributes.vacancy_scores([self._candidate_uri(name) for name in names])
+        labels: Dict[URIRef, List[Any]] = {}
+        results: Dict[str, List[Dict]] = {}
+        all_facts = []
+        
+        for i, candidate_name in enumerate(names):
+            properties: Dict[URIRef, List[Any]] = {}
+            for prop, value in self.om.graph.predicate_objects(self._candidate_uri(candidate_name)):
+                properties.setdefault(prop, []).append(value)
+            
+            if not properties:
+                results[candidate_name] = [{"type": "error", "message": f"Кандидат {candidate_name} не найден в онтологии"}]
+                continue
+            
+            ns = self.om.base_ns
+            skills = properties.get(ns.hasSkill, [])
+            levels = properties.get(ns.hasExperienceLevel, [])
+            years = properties.get(ns.hasYearsOfExperience, [])
+            
+            # Строки в том же виде, что вернули бы запросы candidate_skills
+            # и candidate_experience
+            for skill in skills:
+                if skill not in labels:
+                    labels[skill] = list(self.om.graph.objects(skill, RDFS.label))
+            skill_rows = [_row(skillName=label) for skill in skills for label in labels[skill]]
+            experience_rows = [_row(years=y, level=lv) for y in years for lv in levels or [None]]
+            
+            facts = self._skills_inferences(skill_rows)
+            facts.extend(self._vacancy_matches(scores[i]))
+            facts.extend(self._experience_inferences(experience_rows))
+            results[candidate_name] = facts
+            all_facts.extend(facts)
+        
+        self.inferred_facts = all_facts
+        return results
+    
     def _analyze_skills(self, candidate_name: str) -> List[Dict]:
         """Анализирует навыки кандидата."""
+        return self._skills_inferences(self._query("candidate_skills", candidate_name))
+    
+    def _skills_inferences(self, skills: List[Dict]) -> List[Dict]:
         analysis = []
         
-        query = """
-        PREFIX rec: <http://example.org/it_recruitment#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT ?skillName WHERE {
-            rec:%s rec:hasSkill ?skill .
-            ?skill rdfs:label ?skillName .
-        }
-        """ % candidate_name.replace(" ", "_")
-        
-        skills = self.om.query_ontology(query)
-        
         if skills:
             skill_list = [skill['skillName'] for skill in skills if 'skillName' in skill]
             if skill_list:
@@ -85,111 +165,18 @@ class OntologyReasoner:
     
     def _find_vacancy_matches(self, candidate_name: str) -> List[Dict]:
         """Находит подходящие вакансии для кандидата."""
-        matches = []
-        
-        # Упрощенный запрос для демонстрации
-        query = """
-        PREFIX rec: <http://example.org/it_recruitment#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT ?vacancy ?vacancyName ?requiredSkill ?requiredLevel ?minYears ?maxSalary WHERE {
-            ?vacancy rdf:type rec:Vacancy .
-            ?vacancy rdfs:label ?vacancyName .
-            OPTIONAL { ?vacancy rec:requiresSkill ?requiredSkill . }
-            OPTIONAL { ?vacancy rec:requiresExperienceLevel ?requiredLevel . }
-            OPTIONAL { ?vacancy rec:minYearsOfExperience ?minYears . }
-            OPTIONAL { ?vacancy rec:maxSalary ?maxSalary . }
-        }
-        """
-        
-        vacancies = self.om.query_ontology(query)
-        
-        # Получаем данные кандидата
-        candidate_query = """
-        PREFIX rec: <http://example.org/it_recruitment#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT ?skill ?level ?years ?salary WHERE {
-            rec:%s rec:hasSkill ?skill ;
-                rec:hasExperienceLevel ?level ;
-                rec:hasYearsOfExperience ?years ;
-                rec:expectedSalary ?salary .
-        }
-        """ % candidate_name.replace(" ", "_")
-        
-        candidate_data = self.om.query_ontology(candidate_query)
-        
-        if not candidate_data:
-            return matches
-        
-        candidate_skills = set()
-        candidate_level = ""
-        candidate_years = 0
-        candidate_salary = 0
-        
-        for data in candidate_data:
-            if 'skill' in data:
-                skill_name = data['skill'].split('#')[-1] if '#' in data['skill'] else data['skill']
-                candidate_skills.add(skill_name)
-            if 'level' in data and not candidate_level:
-                candidate_level = data['level'].split('#')[-1] if '#' in data['level'] else data['level']
-            if 'years' in data and not candidate_years:
-                try:
-                    candidate_years = int(data['years'])
-                except:
-                    candidate_years = 0
-            if 'salary' in data and not candidate_salary:
-                try:
-                    candidate_salary = int(data['salary'])
-                except:
-                    candidate_salary = 0
-        
-        # Проверяем соответствие вакансиям
-        for vacancy in vacancies:
-            vacancy_name = vacancy.get('vacancyName', 'Unknown')
-            match_score = 0
-            
-            # Проверка навыков
-            required_skill = vacancy.get('requiredSkill')
-            if required_skill:
-                skill_name = required_skill.split('#')[-1] if '#' in required_skill else required_skill
-                if skill_name in candidate_skills:
-                    match_score += 30
-            
-            # Проверка уровня
-            required_level = vacancy.get('requiredLevel')
-            if required_level and candidate_level:
-                level_name = required_level.split('#')[-1] if '#' in required_level else required_level
-                if level_name.lower() == candidate_level.lower():
-                    match_score += 30
-            
-            # Проверка опыта
-            min_years = vacancy.get('minYears')
-            if min_years:
-                try:
-                    if candidate_years >= int(min_years):
-                        match_score += 20
-                except:
-                    pass
-            
-            # Проверка зарплаты
-            max_salary = vacancy.get('maxSalary')
-            if max_salary:
-                try:
-                    if candidate_salary <= int(max_salary):
-                        match_score += 20
-                except:
-                    pass
-            
-            if match_score > 0:
-                matches.append({
-                    "type": "vacancy_match",
-                    "message": f"Кандидат подходит для вакансии '{vacancy_name}' (совпадение: {match_score}%)",
-                    "vacancy": vacancy_name,
-                    "match_score": match_score
-                })
-        
-        return sorted(matches, key=lambda x: x["match_score"], reverse=True)
+        scores = self.om.attributes.vacancy_scores([self._candidate_uri(candidate_name)])
+        return self._vacancy_matches(scores[0])
+    
+    def _vacancy_matches(self, scores: np.ndarray) -> List[Dict]:
+        """Выводы о вакансиях по строке матрицы баллов (лучшие первыми)."""
+        names = self.om.attributes.vacancy_names
+        return [{
+            "type": "vacancy_match",
+            "message": f"Кандидат подходит для вакансии '{names[j]}' (совпадение: {scores[j]}%)",
+            "vacancy": names[j],
+            "match_score": int(scores[j])
+        } for j in np.argsort(-scores, kind="stable") if scores[j] > 0]
     
     def _calculate_match_score(self, candidate_name: str, vacancy: Dict) -> float:
         """Вычисляет процент совпадения кандидата с вакансией."""
@@ -199,13 +186,6 @@ class OntologyReasoner:
         # Проверка навыков
         required_skill = vacancy.get('requiredSkill')
         if required_skill:
-            skill_query = """
-            PREFIX rec: <http://example.org/it_recruitment#>
-            ASK {
-                rec:%s rec:hasSkill rec:%s .
-            }
-            """ % (candidate_name.replace(" ", "_"), required_skill.split('#')[-1])
-            
             # Упрощенная проверка - в реальной системе нужно использовать SPARQL ASK
             # Здесь для демонстрации считаем, что навык есть
             score += 30
@@ -213,28 +193,14 @@ class OntologyReasoner:
         # Проверка уровня опыта
         required_level = vacancy.get('requiredLevel')
         if required_level:
-            level_query = """
-            PREFIX rec: <http://example.org/it_recruitment#>
-            SELECT ?level WHERE {
-                rec:%s rec:hasExperienceLevel ?level .
-            }
-            """ % candidate_name.replace(" ", "_")
-            
-            candidate_levels = self.om.query_ontology(level_query)
+            candidate_levels = self._query("candidate_level", candidate_name)
             if candidate_levels and any(required_level in str(level) for level in candidate_levels):
                 score += 30
         
         # Проверка минимального опыта
         min_years = vacancy.get('minYears')
         if min_years:
-            experience_query = """
-            PREFIX rec: <http://example.org/it_recruitment#>
-            SELECT ?years WHERE {
-                rec:%s rec:hasYearsOfExperience ?years .
-            }
-            """ % candidate_name.replace(" ", "_")
-            
-            candidate_experience = self.om.query_ontology(experience_query)
+            candidate_experience = self._query("candidate_years", candidate_name)
             if candidate_experience:
                 candidate_years = int(list(candidate_experience[0].values())[0])
                 if candidate_years >= int(min_years):
@@ -243,14 +209,7 @@ class OntologyReasoner:
         # Проверка зарплаты
         max_salary = vacancy.get('maxSalary')
         if max_salary:
-            salary_query = """
-            PREFIX rec: <http://example.org/it_recruitment#>
-            SELECT ?salary WHERE {
-                rec:%s rec:expectedSalary ?salary .
-            }
-            """ % candidate_name.replace(" ", "_")
-            
-            candidate_salary = self.om.query_ontology(salary_query)
+            candidate_salary = self._query("candidate_salary", candidate_name)
             if candidate_salary:
                 candidate_salary_val = int(list(candidate_salary[0].values())[0])
                 if candidate_salary_val <= int(max_salary):
@@ -260,18 +219,11 @@ class OntologyReasoner:
     
     def _analyze_experience(self, candidate_name: str) -> List[Dict]:
         """Анализирует опыт кандидата."""
+        return self._experience_inferences(self._query("candidate_experience", candidate_name))
+    
+    def _experience_inferences(self, experience_data: List[Dict]) -> List[Dict]:
         analysis = []
         
-        query = """
-        PREFIX rec: <http://example.org/it_recruitment#>
-        SELECT ?years ?level WHERE {
-            rec:%s rec:hasYearsOfExperience ?years .
-            OPTIONAL { rec:%s rec:hasExperienceLevel ?level . }
-        }
-        """ % (candidate_name.replace(" ", "_"), candidate_name.replace(" ", "_"))
-        
-        experience_data = self.om.query_ontology(query)
-        
         if experience_data:
             for data in experience_data:
                 years = data.get('years')
@@ -308,4 +260,9 @@ class OntologyReasoner:
             "experience_analyses": len([f for f in self.inferred_facts if f["type"] == "experience_analysis"])
         }
         
-        return summary
\ No newline at end of file
+        return summary
+
+
+def _row(**values) -> Dict[str, str]:
+    """Строка результата в виде query_ontology: пустые значения опускаются."""
+    return {key: str(value) for key, value in values.items() if value}
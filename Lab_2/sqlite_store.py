@@ -0,0 +1,277 @@
+"""Хранилище троек rdflib на SQLite.
+
+SQLiteStore подключается к rdflib.Graph вместо хранилища в памяти:
+термы (URI, пустые узлы, литералы) кодируются целыми числами в словаре
+terms, а тройки хранятся строками чисел с тремя индексами — SPO
+(первичный ключ), POS и OSP, — так что любой шаблон triples() с хотя бы
+одним известным термом выполняется поиском по индексу. Открытие файла не
+требует разбора Turtle, добавление тройки — вставка строки в текущую
+транзакцию (фиксируется Graph.commit), а данные читаются курсором, поэтому
+онтология может быть больше оперативной памяти.
+
+Пример:
+    graph = Graph(store=SQLiteStore())
+    graph.open("data/ontology.sqlite3", create=True)
+"""
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib.store import NO_STORE, VALID_STORE, Store
+from rdflib.term import BNode, Literal, Node, URIRef
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL DEFAULT '',
+    lang TEXT NOT NULL DEFAULT '',
+    UNIQUE (kind, value, datatype, lang)
+);
+
+CREATE TABLE IF NOT EXISTS triples (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_triples_pos ON triples(p, o, s);
+CREATE INDEX IF NOT EXISTS idx_triples_osp ON triples(o, s, p);
+
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL UNIQUE
+);
+"""
+
+# Тройки вместе с данными термов: декодирование без отдельного запроса на терм
+_SELECT = """
+SELECT ts.kind, ts.value, ts.datatype, ts.lang,
+       tp.kind, tp.value, tp.datatype, tp.lang,
+       tob.kind, tob.value, tob.datatype, tob.lang
+FROM triples t
+JOIN terms ts ON ts.id = t.s
+JOIN terms tp ON tp.id = t.p
+JOIN terms tob ON tob.id = t.o
+"""
+
+# Сколько кодов термов держать в памяти (кэш очищается целиком при переполнении)
+TERM_CACHE_SIZE = 100_000
+# Размер пачки строк при чтении и вставке
+FETCH_SIZE = 10_000
+
+TermKey = Tuple[str, str, str, str]
+
+
+def _term_key(term: Node) -> TermKey:
+    if isinstance(term, Literal):
+        return ("L", str(term), str(term.datatype or ""), term.language or "")
+    if isinstance(term, URIRef):
+        return ("U", str(term), "", "")
+    if isinstance(term, BNode):
+        return ("B", str(term), "", "")
+    raise TypeError(f"SQLiteStore не хранит термы типа {type(term).__name__}")
+
+
+def _make_term(kind: str, value: str, datatype: str, lang: str) -> Node:
+    if kind == "U":
+        return URIRef(value)
+    if kind == "B":
+        return BNode(value)
+    return Literal(value, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+
+
+class SQLiteStore(Store):
+    """Хранилище rdflib в файле SQLite со словарём термов и индексами SPO/POS/OSP.
+
+    Хранилище не различает контексты (как Memory для обычного Graph) и
+    поддерживает транзакции: изменения видны сразу, но на диск попадают
+    при commit(), rollback() их отменяет.
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = False
+
+    def __init__(self, configuration: Optional[str] = None, identifier=None):
+        self.conn: Optional[sqlite3.Connection] = None
+        self.path: Optional[str] = None
+        self._ids: Dict[TermKey, int] = {}
+        self._prefix: Dict[URIRef, str] = {}
+        self._namespace: Dict[str, URIRef] = {}
+        super().__init__(configuration, identifier)
+
+    # --- Открытие и закрытие ---
+
+    def open(self, configuration: str, create: bool = False) -> int:
+        if not create and not os.path.exists(configuration):
+            return NO_STORE
+        directory = os.path.dirname(configuration)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = configuration
+        self.conn = sqlite3.connect(configuration)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._ids = {}
+        self._namespace = {p: URIRef(u) for p, u in self.conn.execute("SELECT prefix, uri FROM namespaces")}
+        self._prefix = {u: p for p, u in self._namespace.items()}
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False):
+        if self.conn is None:
+            return
+        if commit_pending_transaction:
+            self.conn.commit()
+        else:
+            self.conn.rollback()
+        self.conn.close()
+        self.conn = None
+
+    def destroy(self, configuration: str):
+        if self.conn is not None and self.path == configuration:
+            self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(configuration + suffix):
+                os.remove(configuration + suffix)
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+        # Коды термов из отменённой транзакции больше не действительны
+        self._ids = {}
+        self._namespace = {p: URIRef(u) for p, u in self.conn.execute("SELECT prefix, uri FROM namespaces")}
+        self._prefix = {u: p for p, u in self._namespace.items()}
+        # Отменённые тройки неизвестны: подписчики получают удаление по шаблону
+        Store.remove(self, (None, None, None), None)
+
+    # --- Словарь термов ---
+
+    def _lookup(self, term: Node) -> Optional[int]:
+        """Код терма или None, если терм в хранилище не встречался."""
+        key = _term_key(term)
+        term_id = self._ids.get(key)
+        if term_id is None:
+            row = self.conn.execute(
+                "SELECT id FROM terms WHERE kind = ? AND value = ? AND datatype = ? AND lang = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            term_id = self._remember(key, row[0])
+        return term_id
+
+    def _intern(self, term: Node) -> int:
+        """Код терма; новый терм добавляется в словарь."""
+        term_id = self._lookup(term)
+        if term_id is None:
+            key = _term_key(term)
+            cursor = self.conn.execute(
+                "INSERT INTO terms (kind, value, datatype, lang) VALUES (?, ?, ?, ?)", key
+            )
+            term_id = self._remember(key, cursor.lastrowid)
+        return term_id
+
+    def _remember(self, key: TermKey, term_id: int) -> int:
+        if len(self._ids) >= TERM_CACHE_SIZE:
+            self._ids.clear()
+        self._ids[key] = term_id
+        return term_id
+
+    # --- Тройки ---
+
+    def add(self, triple, context, quoted: bool = False):
+        Store.add(self, triple, context, quoted)
+        s, p, o = triple
+        self.conn.execute(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+            (self._intern(s), self._intern(p), self._intern(o)),
+        )
+
+    def addN(self, quads: Iterable):  # noqa: N802
+        """Добавляет тройки пачками через executemany."""
+        batch: List[Tuple[int, int, int]] = []
+        for s, p, o, c in quads:
+            Store.add(self, (s, p, o), c)
+            batch.append((self._intern(s), self._intern(p), self._intern(o)))
+            if len(batch) >= FETCH_SIZE:
+                self.conn.executemany("INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)", batch)
+                batch = []
+        if batch:
+            self.conn.executemany("INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)", batch)
+
+    def remove(self, triple, context=None):
+        Store.remove(self, triple, context)
+        where = self._where(triple)
+        if where is None:
+            return
+        sql, params = where
+        self.conn.execute("DELETE FROM triples" + sql, params)
+
+    def _where(self, triple) -> Optional[Tuple[str, List[int]]]:
+        """Условие WHERE по известным позициям шаблона (None — совпадений нет)."""
+        conditions, params = [], []
+        for column, term in zip("spo", triple):
+            if term is None:
+                continue
+            term_id = self._lookup(term)
+            if term_id is None:
+                return None
+            conditions.append(f"{column} = ?")
+            params.append(term_id)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def triples(self, triple_pattern, context=None) -> Iterator:
+        where = self._where(triple_pattern)
+        if where is None:
+            return
+        sql, params = where
+        cursor = self.conn.execute(_SELECT + sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                triple = (_make_term(*row[0:4]), _make_term(*row[4:8]), _make_term(*row[8:12]))
+                yield triple, iter(())
+
+    def __len__(self, context=None) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    # --- Пространства имен (та же логика, что у rdflib Memory.bind) ---
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True):
+        bound_namespace = self._namespace.get(prefix)
+        bound_prefix = self._prefix.get(namespace)
+        if bound_prefix is None and bound_namespace is not None:
+            bound_prefix = self._prefix.get(bound_namespace)
+        if self._namespace.get(prefix) == namespace and self._prefix.get(namespace) == prefix:
+            return
+        if override:
+            if bound_prefix is not None:
+                del self._namespace[bound_prefix]
+            if bound_namespace is not None:
+                del self._prefix[bound_namespace]
+        elif bound_prefix is not None or bound_namespace is not None:
+            return
+        self._prefix[namespace] = prefix
+        self._namespace[prefix] = namespace
+        self.conn.execute("DELETE FROM namespaces WHERE prefix IN (?, ?) OR uri = ?",
+                          (prefix, bound_prefix or prefix, str(namespace)))
+        self.conn.execute("INSERT INTO namespaces (prefix, uri) VALUES (?, ?)", (prefix, str(namespace)))
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        return self._prefix.get(namespace)
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        return iter(list(self._namespace.items()))
@@ -0,0 +1,169 @@
+# batch_cli.py
+"""Пакетный режим подбора: профили вакансий на входе, рейтинги на выходе (JSONL).
+
+Каждая строка входа — JSON-объект профиля в том же виде, что собирает
+run_expert_system_flow (languages, level, years_range, formats,
+salary_range; отсутствующие поля означают "не важно", граница диапазона
+null — без ограничения). Необязательное поле id возвращается в ответе.
+База кандидатов загружается один раз, каждый профиль оценивается выбранным
+механизмом (classic, bayes, fuzzy), и ответ сразу выводится строкой JSON.
+С --workers N подбор classic и bayes выполняется пулом процессов по шардам
+базы (parallel.ParallelRecommender).
+
+Пример:
+    python batch_cli.py --engine bayes --top-k 10 profiles.jsonl > results.jsonl
+    cat profiles.jsonl | python batch_cli.py --engine fuzzy
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+# Добавляем пути для импорта существующих модулей
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "Lab_1"))
+
+import candidate_manager
+from candidate_manager import Candidate
+from candidate_store import load_from_store
+from config import RECOMMEND_WORKERS
+from expert_system import recommend
+from parallel import ParallelRecommender
+from fuzzy_system import FuzzyExpertSystem, _as_candidate_dicts
+
+ENGINES = ("classic", "bayes", "fuzzy")
+
+
+def parse_profile(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Приводит JSON-объект к профилю run_expert_system_flow.
+
+    Поля неверного типа вызывают ValueError с именем поля.
+    """
+    def is_number(value) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def as_range(name: str) -> tuple:
+        value = data.get(name)
+        if value is None:
+            return (0, float("inf"))
+        if (not isinstance(value, list) or len(value) > 2
+                or not all(v is None or is_number(v) for v in value)):
+            raise ValueError(f"поле '{name}' должно быть списком [от, до] из чисел или null")
+        low, high = (value + [None, None])[:2]
+        return (low or 0, float("inf") if high is None else high)
+
+    def as_list(name: str) -> List[str]:
+        value = data.get(name)
+        if isinstance(value, str):
+            value = value.split(",")
+        if value is not None and (not isinstance(value, list) or not all(isinstance(v, str) for v in value)):
+            raise ValueError(f"поле '{name}' должно быть строкой или списком строк")
+        return [v.strip() for v in value or [] if v.strip()]
+
+    level = data.get("level")
+    if level is not None and not isinstance(level, str):
+        raise ValueError("поле 'level' должно быть строкой")
+    return {
+        "languages": as_list("languages"),
+        "level": (level or "").strip().lower(),
+        "years_range": as_range("years_range"),
+        "formats": as_list("formats"),
+        "salary_range": as_range("salary_range"),
+    }
+
+
+def candidate_json(c: Candidate) -> Dict[str, Any]:
+    return {"name": c.name, "language": c.language, "level": c.level,
+            "years": c.years, "format": c.format, "salary": c.salary}
+
+
+class BatchRunner:
+    """Оценивает профили выбранным механизмом над загруженной один раз базой."""
+
+    def __init__(self, engine: str, flags: Dict[str, bool], top_k: Optional[int] = None,
+                 workers: int = RECOMMEND_WORKERS):
+        self.engine = engine
+        self.flags = dict(flags, bayes=engine == "bayes", why=False, explain=False)
+        self.top_k = top_k
+        # Сообщения загрузки не должны попадать в поток JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            self.candidates = load_from_store()
+        self.pool = None
+        if workers and engine != "fuzzy":
+            self.pool = ParallelRecommender(self.candidates, workers)
+        if engine == "fuzzy":
+            # Словари кандидатов для нечеткой системы тоже строятся один раз
+            self.fuzzy = FuzzyExpertSystem()
+            self.candidate_dicts = list(_as_candidate_dicts(self.candidates))
+
+    def rank(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if self.engine == "fuzzy":
+            results = self.fuzzy.fuzzy_recommend(self.candidate_dicts, profile, top_k=self.top_k)
+            return [{"name": r["candidate_name"], "score": r["final_score"],
+                     "recommendation": r["recommendation"]} for r in results]
+        if self.pool is not None:
+            results = self.pool.recommend(profile, self.flags, top_k=self.top_k)
+        else:
+            results = recommend(self.candidates, profile, self.flags, top_k=self.top_k)
+        if self.engine == "bayes":
+            return [dict(candidate_json(c), probability=p) for c, p in results]
+        return [candidate_json(c) for c in results[:self.top_k]]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def run(self, lines: Iterable[str], out: TextIO) -> int:
+        """Обрабатывает строки JSONL; возвращает число строк с ошибками."""
+        errors = 0
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError("строка должна содержать JSON-объект профиля")
+                response = {"line": number, "engine": self.engine,
+                            "results": self.rank(parse_profile(data))}
+                if "id" in data:
+                    response["id"] = data["id"]
+            except (ValueError, TypeError) as e:
+                errors += 1
+                response = {"line": number, "error": str(e)}
+            out.write(json.dumps(response, ensure_ascii=False) + "\n")
+            # Ответ выводится сразу, не дожидаясь конца входа
+            out.flush()
+        return errors
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетный подбор кандидатов (JSONL)")
+    parser.add_argument("input", nargs="?", default="-", help="файл JSONL с профилями (- — stdin)")
+    parser.add_argument("--engine", choices=ENGINES, default="classic")
+    parser.add_argument("--top-k", type=int, help="сколько лучших кандидатов выводить")
+    parser.add_argument("--relaxed", action="store_true", help="мягкий режим (classic)")
+    parser.add_argument("--all", action="store_true", help="строгий режим (classic)")
+    parser.add_argument("--db", help="CSV базы знаний вместо config.DB_PATH")
+    parser.add_argument("--workers", type=int, default=RECOMMEND_WORKERS,
+                        help="число процессов пула подбора (0 — без пула)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        candidate_manager.DB_PATH = args.db
+    runner = BatchRunner(args.engine, {"relaxed": args.relaxed, "all": args.all}, args.top_k,
+                         workers=args.workers)
+    try:
+        if args.input == "-":
+            errors = runner.run(sys.stdin, sys.stdout)
+        else:
+            with open(args.input, encoding="utf-8") as f:
+                errors = runner.run(f, sys.stdout)
+    finally:
+        runner.close()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
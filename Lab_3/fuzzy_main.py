@@ -6,7 +6,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "Lab_1"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "Lab_2"))
 
-from candidate_manager import load_candidates, save_candidate, Candidate
+from candidate_manager import Candidate
+from candidate_store import load_from_store, save_to_store
 from expert_system import get_user_profile
 from config import LANGUAGES, EXPERIENCE_LEVELS, WORK_FORMATS
 from fuzzy_system import FuzzyExpertSystem, FuzzyLogicSystem
@@ -64,13 +65,13 @@ def add_candidate_flow():
         return
 
     candidate = Candidate(name=name, language=langs, level=level, years=years, format=fmts, salary=salary)
-    save_candidate(candidate)
+    save_to_store(candidate)
     print(f"✓ Кандидат '{candidate.name}' успешно добавлен в базу знаний.")
 
 def run_traditional_expert_system():
     """Запуск традиционной экспертной системы"""
     print("\n--- Традиционный подбор кандидатов ---")
-    candidates = load_candidates()
+    candidates = load_from_store()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -101,7 +102,7 @@ def run_traditional_expert_system():
 def run_fuzzy_expert_system():
     """Запуск нечеткой экспертной системы"""
     print("\n--- Нечеткий подбор кандидатов ---")
-    candidates = load_candidates()
+    candidates = load_from_store()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -172,7 +173,7 @@ def run_fuzzy_expert_system():
 def detailed_fuzzy_analysis():
     """Детальный анализ конкретного кандидата"""
     print("\n--- Детальный нечеткий анализ кандидата ---")
-    candidates = load_candidates()
+    candidates = load_from_store()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -247,7 +248,7 @@ def detailed_fuzzy_analysis():
 def compare_candidates_flow():
     """Сравнение нескольких кандидатов"""
     print("\n--- Сравнение кандидатов ---")
-    candidates = load_candidates()
+    candidates = load_from_store()
     if not candidates:
         print("База знаний пуста. Добавьте кандидатов.")
         return
@@ -395,7 +396,7 @@ def main():
     print("🚀 Загрузка экспертной системы с нечеткой логикой...")
     
     # Проверяем наличие кандидатов
-    candidates = load_candidates()
+    candidates = load_from_store()
     if candidates:
         print(f"✅ Загружено {len(candidates)} кандидатов из базы знаний")
     else:
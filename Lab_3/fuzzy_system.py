@@ -1,6 +1,7 @@
 # fuzzy_system.py
+import heapq
 import numpy as np
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Iterable, Iterator
 from dataclasses import dataclass
 import math
 
@@ -399,15 +400,39 @@ class FuzzyLogicSystem:
         else:
             return "Низкое соответствие - не рекомендуется"
     
-    def batch_evaluate(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Оценивает нескольких кандидатов"""
-        results = []
-        for candidate in candidates:
-            result = self.evaluate_candidate(candidate)
-            results.append(result)
-        
-        # Сортировка по убыванию оценки
-        return sorted(results, key=lambda x: x["final_score"], reverse=True)
+    def batch_evaluate(self, candidates: Iterable[Dict[str, Any]],
+                       top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Оценивает нескольких кандидатов
+        
+        При заданном top_k в памяти держится куча из top_k лучших
+        результатов, а не результаты по всем кандидатам.
+        """
+        results = (self.evaluate_candidate(candidate) for candidate in candidates)
+        key = lambda x: x["final_score"]
+        
+        # Сортировка по убыванию оценки (равные оценки - в порядке входа)
+        if top_k is None:
+            return sorted(results, key=key, reverse=True)
+        return heapq.nlargest(top_k, results, key=key)
+
+def _as_candidate_dicts(candidates: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+    """Приводит кандидатов к словарям; пачки кандидатов разворачиваются"""
+    for item in candidates:
+        if isinstance(item, dict):
+            yield item
+        elif isinstance(item, (str, bytes)):
+            raise TypeError(f"Ожидался кандидат или пачка кандидатов, получена строка {item!r}")
+        elif hasattr(item, "name"):
+            yield {
+                "name": item.name,
+                "language": item.language,
+                "level": item.level,
+                "years": item.years,
+                "format": item.format,
+                "salary": item.salary
+            }
+        else:
+            yield from _as_candidate_dicts(item)
 
 # Интеграция с существующей системой
 class FuzzyExpertSystem:
@@ -416,26 +441,38 @@ class FuzzyExpertSystem:
     def __init__(self):
         self.fuzzy_system = FuzzyLogicSystem()
     
-    def fuzzy_recommend(self, candidates: List[Dict[str, Any]], 
-                       profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Нечеткий подбор кандидатов с учетом профиля вакансии"""
+    def fuzzy_recommend(self, candidates: Iterable[Any], 
+                       profile: Dict[str, Any],
+                       top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Нечеткий подбор кандидатов с учетом профиля вакансии
+        
+        Кандидаты могут быть словарями, объектами Candidate или пачками
+        из iter_candidates - они обогащаются и оцениваются по одному.
+        top_k ограничивает результат (и память) лучшими кандидатами.
+        """
         
         # Обогащаем данные кандидатов информацией о соответствии профилю
-        enriched_candidates = []
-        for candidate in candidates:
-            enriched_candidate = candidate.copy()
-            
-            # Вычисляем дополнительные метрики для нечеткой системы
-            match_metrics = self._calculate_match_metrics(candidate, profile)
-            enriched_candidate.update(match_metrics)
-            
-            enriched_candidates.append(enriched_candidate)
+        enriched_candidates = (
+            self._enrich_candidate(candidate, profile)
+            for candidate in _as_candidate_dicts(candidates)
+        )
         
         # Оцениваем кандидатов с помощью нечеткой логики
-        fuzzy_results = self.fuzzy_system.batch_evaluate(enriched_candidates)
+        fuzzy_results = self.fuzzy_system.batch_evaluate(enriched_candidates, top_k)
         
         return fuzzy_results
     
+    def _enrich_candidate(self, candidate: Dict[str, Any], 
+                          profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Дополняет кандидата метриками соответствия профилю"""
+        enriched_candidate = candidate.copy()
+        
+        # Вычисляем дополнительные метрики для нечеткой системы
+        match_metrics = self._calculate_match_metrics(candidate, profile)
+        enriched_candidate.update(match_metrics)
+        
+        return enriched_candidate
+    
     def _calculate_match_metrics(self, candidate: Dict[str, Any], 
                                 profile: Dict[str, Any]) -> Dict[str, Any]:
         """Вычисляет метрики соответствия кандидата профилю вакансии"""
@@ -0,0 +1,373 @@
+# server.py
+"""Локальный HTTP/JSON сервер подбора с базой знаний в памяти.
+
+Таблица кандидатов, граф онтологии (OntologyManager) и правила нечеткой
+системы загружаются один раз и остаются в памяти процесса, поэтому запрос
+не платит за разбор CSV, Turtle и построение FuzzyLogicSystem. Сервер
+построен на asyncio без сторонних зависимостей и слушает только localhost.
+Подбор выполняется в отдельном потоке (executor) с одним рабочим: граф
+rdflib и общие словари не потокобезопасны, а цикл событий не блокируется.
+Фоновая задача следит за файлами базы кандидатов (config.STORAGE_BACKEND)
+и онтологии (ontology.ttl с журналом изменений или база SQLite, см.
+config.ONTOLOGY_BACKEND) и перезагружает данные при их изменении.
+С --workers N (config.RECOMMEND_WORKERS) классический и байесовский подбор
+выполняются пулом процессов по шардам таблицы (parallel.ParallelRecommender);
+пул перестраивается вместе с таблицей при перезагрузке базы.
+
+Запросы (тело и ответ — JSON):
+    POST /recommend  {"profile": {...}, "relaxed": false, "all": false, "top_k": 10}
+    POST /bayes      {"profile": {...}, "top_k": 10}
+    POST /fuzzy      {"profile": {...}, "top_k": 10}
+    POST /reason     {"candidate": "Иван_Петров"}
+    GET  /health
+Профиль — в том же виде, что и в batch_cli (поля run_expert_system_flow).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Добавляем пути для импорта существующих модулей
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "Lab_1"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "Lab_2"))
+
+import candidate_manager
+from candidate_index import CandidateIndex
+from candidate_store import load_from_store, store_files
+from config import ONTOLOGY_BACKEND, RECOMMEND_WORKERS
+from expert_system import recommend
+from ontology import OntologyManager, default_store_path
+from parallel import ParallelRecommender
+from reasoner import OntologyReasoner
+from fuzzy_system import FuzzyExpertSystem, _as_candidate_dicts
+from batch_cli import candidate_json, parse_profile
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_ONTOLOGY = os.path.join(os.path.dirname(__file__), "..", "Lab_2", "data", "ontology.ttl")
+# Период опроса файлов базы знаний (сек.)
+WATCH_INTERVAL = 1.0
+# Наибольший размер тела запроса (байт) и число заголовков
+MAX_BODY = 1024 * 1024
+MAX_HEADERS = 100
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _ontology_state(path: str, backend: str):
+    """Состояние файлов онтологии: базы SQLite с её WAL или снимка и журналов."""
+    if backend == "sqlite":
+        store = default_store_path(path)
+        return _file_state(store), _file_state(store + "-wal")
+    journal = path + ".journal"
+    return _file_state(path), _file_state(journal), _file_state(journal + ".compacting")
+
+
+def _candidates_state():
+    """Состояние файлов базы кандидатов (config.STORAGE_BACKEND)."""
+    return tuple(_file_state(path) for path in store_files())
+
+
+def _file_state(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ResidentState:
+    """База кандидатов, онтология и нечеткая система, загруженные один раз.
+
+    Перезагрузка строит новые объекты и подменяет ссылки целиком, поэтому
+    запрос всегда видит согласованное состояние.
+    """
+
+    def __init__(self, ontology_path: str, ontology_backend: str = ONTOLOGY_BACKEND,
+                 workers: int = RECOMMEND_WORKERS):
+        self.ontology_path = ontology_path
+        self.ontology_backend = ontology_backend
+        self.workers = workers
+        self.candidates = None
+        self.index: Optional[CandidateIndex] = None
+        self.pool: Optional[ParallelRecommender] = None
+        self.candidate_dicts = []
+        self.ontology: Optional[OntologyManager] = None
+        self.reasoner: Optional[OntologyReasoner] = None
+        # Правила нечеткой системы от данных не зависят: строятся один раз
+        self.fuzzy = FuzzyExpertSystem()
+        self.files: Dict[str, Any] = {}
+        self.loaded_at: Dict[str, float] = {}
+
+    def reload_candidates(self):
+        self.files["candidates"] = _candidates_state()
+        candidates = load_from_store()
+        # База меняется другими процессами и перечитывается целиком, поэтому
+        # индекс строится заново, а не подписывается на запись (attach)
+        index = CandidateIndex(candidates)
+        pool = ParallelRecommender(candidates, self.workers) if self.workers else None
+        previous = self.pool
+        self.candidates, self.index, self.pool = candidates, index, pool
+        if previous is not None:
+            previous.close()
+        self.candidate_dicts = list(_as_candidate_dicts(candidates))
+        self.loaded_at["candidates"] = time.time()
+        print(f"Загружено кандидатов: {len(candidates)}", flush=True)
+
+    def reload_ontology(self):
+        manager = OntologyManager(self.ontology_path, backend=self.ontology_backend)
+        # Состояние снимается после открытия: SQLite при этом создает файл -wal
+        self.files["ontology"] = _ontology_state(self.ontology_path, self.ontology_backend)
+        manager.load_ontology()
+        previous = self.ontology
+        self.ontology, self.reasoner = manager, OntologyReasoner(manager)
+        if previous is not None:
+            # Прежнее соединение с базой SQLite больше не нужно
+            previous.close()
+        self.loaded_at["ontology"] = time.time()
+        print(f"Троек в онтологии: {len(manager.graph)}", flush=True)
+
+    def changed(self) -> Dict[str, bool]:
+        """Какие файлы изменились с последней загрузки."""
+        return {
+            "candidates": _candidates_state() != self.files.get("candidates"),
+            "ontology": (_ontology_state(self.ontology_path, self.ontology_backend)
+                         != self.files.get("ontology")),
+        }
+
+    # --- Обработчики запросов (выполняются в executor) ---
+
+    def recommend(self, body: Dict[str, Any], bayes: bool = False) -> Dict[str, Any]:
+        profile = parse_profile(_field(body, "profile", dict))
+        top_k = _top_k(body)
+        flags = {"relaxed": bool(body.get("relaxed")), "all": bool(body.get("all")),
+                 "why": False, "explain": False, "bayes": bayes}
+        if self.pool is not None:
+            results = self.pool.recommend(profile, flags, top_k=top_k)
+        else:
+            # Классический подбор — по индексу, байесовский — по таблице
+            results = recommend(self.candidates if bayes else self.index, profile, flags, top_k=top_k)
+        if bayes:
+            return {"results": [dict(candidate_json(c), probability=p) for c, p in results]}
+        return {"count": len(results), "results": [candidate_json(c) for c in results[:top_k]]}
+
+    def bayes(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self.recommend(body, bayes=True)
+
+    def fuzzy_rank(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        profile = parse_profile(_field(body, "profile", dict))
+        results = self.fuzzy.fuzzy_recommend(self.candidate_dicts, profile, top_k=_top_k(body))
+        return {"results": [{"name": r["candidate_name"], "score": r["final_score"],
+                             "recommendation": r["recommendation"]} for r in results]}
+
+    def reason(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        name = _field(body, "candidate", str)
+        inferences = self.reasoner.reason_about_candidate(name)
+        if inferences and inferences[0].get("type") == "error":
+            return {"inferences": inferences}
+        return {"inferences": inferences, "summary": self.reasoner.get_inference_summary()}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def health(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "candidates": len(self.candidates) if self.candidates is not None else 0,
+            "triples": len(self.ontology.graph) if self.ontology is not None else 0,
+            "loaded_at": self.loaded_at,
+        }
+
+
+def _field(body: Dict[str, Any], name: str, kind: type):
+    value = body.get(name)
+    if not isinstance(value, kind):
+        raise HttpError(400, f"поле '{name}' обязательно ({kind.__name__})")
+    return value
+
+
+def _top_k(body: Dict[str, Any]) -> Optional[int]:
+    top_k = body.get("top_k")
+    if top_k is not None and (not isinstance(top_k, int) or top_k < 0):
+        raise HttpError(400, "top_k должно быть неотрицательным целым")
+    return top_k
+
+
+class RecommendationServer:
+    """HTTP/1.1 сервер (keep-alive) над ResidentState."""
+
+    def __init__(self, state: ResidentState, port: int = DEFAULT_PORT,
+                 watch_interval: float = WATCH_INTERVAL, max_body: int = MAX_BODY):
+        self.state = state
+        self.port = port
+        self.watch_interval = watch_interval
+        self.max_body = max_body
+        # Один рабочий поток: запросы и перезагрузки не выполняются одновременно
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            ("POST", "/recommend"): state.recommend,
+            ("POST", "/bayes"): state.bayes,
+            ("POST", "/fuzzy"): state.fuzzy_rank,
+            ("POST", "/reason"): state.reason,
+            ("GET", "/health"): state.health,
+        }
+
+    async def run_in_executor(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def serve(self):
+        await self.run_in_executor(self.state.reload_candidates)
+        await self.run_in_executor(self.state.reload_ontology)
+        server = await asyncio.start_server(self.handle, HOST, self.port)
+        watcher = asyncio.create_task(self.watch())
+        print(f"Сервер подбора слушает http://{HOST}:{self.port}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            self.executor.shutdown(wait=False)
+
+    async def watch(self):
+        """Перезагружает кандидатов и онтологию при изменении их файлов."""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            changed = self.state.changed()
+            try:
+                if changed["candidates"]:
+                    await self.run_in_executor(self.state.reload_candidates)
+                if changed["ontology"]:
+                    await self.run_in_executor(self.state.reload_ontology)
+            except Exception as e:
+                # Файл может быть недописан: повторим на следующем опросе
+                print(f"Ошибка перезагрузки базы знаний: {e}", flush=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HttpError as e:
+            with contextlib.suppress(ConnectionError):
+                self._write_response(writer, e.status, {"error": str(e)}, False)
+                await writer.drain()
+        finally:
+            with contextlib.suppress(ConnectionError):
+                writer.close()
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await _readline(reader)
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "некорректная строка запроса")
+        headers = {}
+        for _ in range(MAX_HEADERS + 1):
+            header = (await _readline(reader)).decode("latin-1")
+            if header in ("\r\n", "\n", ""):
+                break
+            name, _, value = header.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(400, "слишком много заголовков")
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            raise HttpError(400, f"некорректный Content-Length: {length!r}")
+        length = int(length)
+        if length > self.max_body:
+            raise HttpError(413, "слишком большое тело запроса")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(p == path for _, p in self.routes):
+                return 405, {"error": f"метод {method} не поддерживается для {path}"}
+            return 404, {"error": f"неизвестный адрес {path}"}
+        try:
+            data = json.loads(body.decode("utf-8")) if body else {}
+            if not isinstance(data, dict):
+                raise HttpError(400, "тело запроса должно быть JSON-объектом")
+            start = time.perf_counter()
+            result = await self.run_in_executor(handler, data)
+            result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            return 200, result
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int,
+                        payload: Dict[str, Any], keep_alive: bool):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    """Строка запроса или заголовка; слишком длинная строка — ошибка 400."""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(400, "слишком длинная строка запроса или заголовка")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальный сервер подбора кандидатов")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", help="CSV базы знаний вместо config.DB_PATH")
+    parser.add_argument("--ontology", default=DEFAULT_ONTOLOGY, help="файл онтологии (Turtle)")
+    parser.add_argument("--ontology-backend", choices=("turtle", "sqlite"), default=ONTOLOGY_BACKEND,
+                        help="хранилище онтологии вместо config.ONTOLOGY_BACKEND")
+    parser.add_argument("--watch-interval", type=float, default=WATCH_INTERVAL)
+    parser.add_argument("--max-body", type=int, default=MAX_BODY, help="наибольший размер тела запроса (байт)")
+    parser.add_argument("--workers", type=int, default=RECOMMEND_WORKERS,
+                        help="число процессов пула подбора (0 — без пула)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        candidate_manager.DB_PATH = args.db
+    state = ResidentState(args.ontology, args.ontology_backend, args.workers)
+    server = RecommendationServer(state, args.port, args.watch_interval, args.max_body)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nСервер остановлен.")
+    finally:
+        state.close()
+
+
+if __name__ == "__main__":
+    main()